@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Throttled backfill of unannounced posts.
+Announcing every unlogged post at once floods the feed after the posted log
+is reset or a workflow is re-enabled. Only the newest posts go out
+immediately; older ones are kept in a persistent priority queue (ranked by
+recency, tag weights and an announce_weight front matter field) and released
+a few at a time across runs.
+"""
+
+import heapq
+import json
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import yaml
+
+# Configuration
+QUEUE_FILE = ".github/scripts/announce_queue.json"
+CONFIG_FILE = Path(__file__).parent / "announce_backfill.yml"
+QUEUE_VERSION = 1
+WEIGHT_FIELD = "announce_weight"
+
+DEFAULTS = {
+    'immediate_days': 2,
+    'rate': 1,
+    'interval_hours': 24,
+    'recency_weight': 10,
+    'recency_half_life_days': 180,
+    'tag_weights': {},
+}
+
+
+def load_config(path=CONFIG_FILE):
+    """Load the backfill settings, falling back to the defaults."""
+    config = dict(DEFAULTS)
+    if Path(path).exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            config.update(yaml.safe_load(f) or {})
+    config['tag_weights'] = {str(tag).lower(): weight for tag, weight in (config['tag_weights'] or {}).items()}
+    return config
+
+
+def load_queue(path=QUEUE_FILE):
+    """Load the queue state."""
+    queue_file = Path(path)
+    if queue_file.exists():
+        with open(queue_file, 'r', encoding='utf-8') as f:
+            queue = json.load(f)
+        if queue.get('version') == QUEUE_VERSION:
+            return queue
+    return {'version': QUEUE_VERSION, 'last_release': None, 'entries': {}}
+
+
+def save_queue(queue, path=QUEUE_FILE):
+    """Save the queue state."""
+    queue_file = Path(path)
+    queue_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(queue_file, 'w', encoding='utf-8') as f:
+        json.dump(queue, f, indent=2, sort_keys=True)
+
+
+def post_date(front_matter):
+    """Return the publication date of a post, or None."""
+    value = front_matter.get('date')
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).date()
+    except ValueError:
+        return None
+
+
+def priority(front_matter, today, config):
+    """Score a post: higher is announced first."""
+    age = max(0, (today - post_date(front_matter)).days)
+    recency = config['recency_weight'] * 0.5 ** (age / config['recency_half_life_days'])
+    tags = sum(config['tag_weights'].get(str(tag).lower(), 0) for tag in front_matter.get('tags') or [])
+    try:
+        weight = float(front_matter.get(WEIGHT_FIELD) or 0)
+    except (TypeError, ValueError):
+        weight = 0.0
+    return round(recency + tags + weight, 4)
+
+
+def is_immediate(front_matter, today, config):
+    """Return True for posts recent enough to skip the queue."""
+    return (today - post_date(front_matter)).days <= config['immediate_days']
+
+
+def sync_queue(queue, backlog, today, config):
+    """Make the queue hold exactly the backlog posts, with fresh priorities.
+
+    backlog is a list of post dicts (post_id, front_matter) that are eligible
+    but not yet announced everywhere. Posts that were announced, removed or
+    turned back into drafts since the last run drop out of the queue.
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    entries = {}
+    for post in backlog:
+        front_matter = post['front_matter']
+        previous = queue['entries'].get(post['post_id'], {})
+        entries[post['post_id']] = {
+            'title': front_matter.get('title', 'Untitled'),
+            'date': post_date(front_matter).isoformat(),
+            'priority': priority(front_matter, today, config),
+            'queued_at': previous.get('queued_at', now),
+        }
+    added = len(set(entries) - set(queue['entries']))
+    removed = len(set(queue['entries']) - set(entries))
+    queue['entries'] = entries
+    return added, removed
+
+
+def release_due(queue, now, config):
+    """Pop the highest-priority post ids that may be announced now.
+
+    At most config['rate'] posts are released, and only when
+    config['interval_hours'] have passed since the previous release.
+    """
+    if not queue['entries'] or config['rate'] <= 0:
+        return []
+    last = queue.get('last_release')
+    if last and now - datetime.fromisoformat(last) < timedelta(hours=config['interval_hours']):
+        return []
+    # Highest priority first, newer posts win ties
+    heap = [(-entry['priority'], _negated_date(entry['date']), post_id)
+            for post_id, entry in queue['entries'].items()]
+    heapq.heapify(heap)
+    released = [heapq.heappop(heap)[2] for _ in range(min(config['rate'], len(heap)))]
+    queue['last_release'] = now.isoformat()
+    return released
+
+
+def next_release(queue, config):
+    """Return when the next post will be released, or None if the queue is empty."""
+    if not queue['entries']:
+        return None
+    if not queue.get('last_release'):
+        return datetime.now(timezone.utc)
+    return datetime.fromisoformat(queue['last_release']) + timedelta(hours=config['interval_hours'])
+
+
+def _negated_date(value):
+    return -date.fromisoformat(value).toordinal()
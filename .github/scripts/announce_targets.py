@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Announce blog posts on several networks at once.
+A post is parsed once into an Announcement and handed to every configured
+target (Bluesky, Mastodon, a generic webhook). Each target renders its own
+format and runs in its own thread with its own rate limiter and retry policy,
+so a slow or failing network never holds up the others. Results are recorded
+per target in the posted log.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+import requests
+from atproto import Client, models
+from atproto import exceptions as atproto_exceptions
+from atproto_client.models.blob_ref import BlobRef
+
+from bluesky_composer import LINK_FEATURE, TAG_FEATURE, compose_post
+from bluesky_link_card import (SITE_DIR, external_embed, load_blob_cache, read_link_card,
+                               save_blob_cache, thumbnail_blob)
+from instrumentation import count, stage
+
+# Configuration
+MASTODON_MAX_CHARS = 500
+REQUEST_TIMEOUT = 30
+# Targets recorded for log entries written before the log was per target
+LEGACY_TARGET = "bluesky"
+# Alphabet of the base32-sortable TIDs Bluesky posts are keyed by
+TID_ALPHABET = "234567abcdefghijklmnopqrstuvwxyz"
+
+
+class Announcement(NamedTuple):
+    """A blog post as every target sees it."""
+    post_id: str
+    title: str
+    summary: str
+    url: str
+    tags: list
+
+    @classmethod
+    def from_post(cls, post):
+        """Build an announcement from a post dict as returned by load_archive_posts()."""
+        return cls(post['post_id'], post.get('title') or 'Untitled', post.get('summary') or '',
+                   post['url'], list(post.get('tags') or []))
+
+
+class RetryPolicy(NamedTuple):
+    """How often and how patiently a target retries a failed publish."""
+    attempts: int = 3
+    backoff: float = 2.0
+    max_backoff: float = 60.0
+
+    def delay(self, attempt, error=None):
+        """Seconds to wait before the next attempt, honouring Retry-After."""
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+
+class RateLimiter:
+    """Spaces out the calls of one target to at most per_minute a minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self.interval
+        if delay:
+            time.sleep(delay)
+
+
+def _response_of(error):
+    return getattr(error, 'response', None)
+
+
+def _retry_after(error):
+    response = _response_of(error)
+    value = getattr(response, 'headers', {}).get('retry-after') if response is not None else None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error):
+    """Retry network errors, timeouts, 429 and 5xx, but nothing else."""
+    status = getattr(_response_of(error), 'status_code', None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout, atproto_exceptions.NetworkError))
+
+
+def record_key(post_id, now=None):
+    """Return the TID record key a post is announced on Bluesky under.
+
+    A TID is a microsecond timestamp followed by a 10-bit clock ID. The clock
+    ID is taken from post_id, and the key is made once per publish, so every
+    retry writes the same record instead of creating another one.
+    """
+    micros = int((time.time() if now is None else now) * 1_000_000)
+    clock_id = int.from_bytes(hashlib.sha256(post_id.encode()).digest()[:2], 'big') & 0x3FF
+    value = (micros << 10) | clock_id
+    return ''.join(TID_ALPHABET[(value >> shift) & 31] for shift in range(60, -1, -5))
+
+
+class Target:
+    """A network posts are announced on."""
+
+    name = "target"
+    rate_per_minute = 10
+
+    def __init__(self, retry=None, rate_per_minute=None):
+        self.retry = retry or RetryPolicy()
+        self.limiter = RateLimiter(rate_per_minute or self.rate_per_minute)
+
+    def render(self, announcement):
+        """Return the payload for an announcement."""
+        raise NotImplementedError
+
+    def send(self, payload, announcement):
+        """Send a rendered payload and return the fields to log."""
+        raise NotImplementedError
+
+    def describe(self, payload):
+        """Human-readable version of a payload for dry runs."""
+        return payload if isinstance(payload, str) else json.dumps(payload, indent=2, default=str)
+
+    def publish(self, announcement):
+        """Render and send an announcement, retrying transient failures."""
+        with stage("compose"):
+            payload = self.render(announcement)
+        for attempt in range(1, self.retry.attempts + 1):
+            self.limiter.wait()
+            try:
+                with stage(f"http_{self.name}"):
+                    count("http_calls")
+                    return self.send(payload, announcement)
+            except Exception as e:
+                if attempt == self.retry.attempts or not is_retryable(e):
+                    raise
+                count("retries")
+                delay = self.retry.delay(attempt, e)
+                print(f"  [{self.name}] ⚠️ Attempt {attempt} failed ({e}), retrying in {delay:.0f}s")
+                time.sleep(delay)
+
+
+def to_atproto_facets(facets):
+    """Convert composer facets (lexicon dicts) into atproto models."""
+    result = []
+    for facet in facets:
+        features = []
+        for feature in facet['features']:
+            if feature['$type'] == LINK_FEATURE:
+                features.append(models.AppBskyRichtextFacet.Link(uri=feature['uri']))
+            elif feature['$type'] == TAG_FEATURE:
+                features.append(models.AppBskyRichtextFacet.Tag(tag=feature['tag']))
+        index = models.AppBskyRichtextFacet.ByteSlice(
+            byte_start=facet['index']['byteStart'],
+            byte_end=facet['index']['byteEnd'],
+        )
+        result.append(models.AppBskyRichtextFacet.Main(index=index, features=features))
+    return result
+
+
+def build_link_card_embed(client, card, blob_cache):
+    """Build the external embed for a link card, uploading its thumbnail only once."""
+    thumb = None
+    if card['image']:
+        def upload(data):
+            count("http_calls")
+            return client.upload_blob(data).blob.model_dump(by_alias=True, mode='json')
+        try:
+            thumb, uploaded = thumbnail_blob(card['image'], blob_cache, upload)
+            if thumb:
+                print(f"🖼️ {'Uploaded' if uploaded else 'Reusing cached'} thumbnail {card['image']}")
+        except Exception as e:
+            print(f"⚠️ Could not upload thumbnail {card['image']}: {e}")
+    embed = external_embed(card, thumb)['external']
+    return models.AppBskyEmbedExternal.Main(external=models.AppBskyEmbedExternal.External(
+        uri=embed['uri'],
+        title=embed['title'],
+        description=embed['description'],
+        thumb=BlobRef.model_validate(embed['thumb']) if 'thumb' in embed else None,
+    ))
+
+
+class BlueskyTarget(Target):
+    """Bluesky, with clickable facets and a link card from the built site."""
+
+    name = "bluesky"
+    rate_per_minute = 10
+
+    def __init__(self, identifier, password, base_url=None, site_dir=SITE_DIR, **kwargs):
+        super().__init__(**kwargs)
+        self.identifier = identifier
+        self.password = password
+        self.base_url = base_url
+        self.site_dir = site_dir
+        self._client = None
+
+    def render(self, announcement):
+        post = compose_post(announcement.title, announcement.summary, announcement.url, announcement.tags)
+        return {'post': post, 'card': read_link_card(announcement.url, self.site_dir, announcement.post_id),
+                'rkey': record_key(announcement.post_id), 'attempts': 0}
+
+    def describe(self, payload):
+        return payload['post'].text
+
+    def client(self):
+        if self._client is None:
+            client = Client(base_url=self.base_url)
+            client.login(self.identifier, self.password)
+            self._client = client
+        return self._client
+
+    def existing_post(self, client, rkey):
+        """Return the URI of the post stored under rkey, or None."""
+        try:
+            return client.app.bsky.feed.post.get(client.me.did, rkey).uri
+        except atproto_exceptions.BadRequestError:
+            return None  # RecordNotFound
+
+    def send(self, payload, announcement):
+        client = self.client()
+        # createRecord is not idempotent: when an earlier attempt timed out
+        # after the post was stored, report that post instead of a second one
+        if payload['attempts']:
+            uri = self.existing_post(client, payload['rkey'])
+            if uri:
+                return {'uri': uri}
+        payload['attempts'] += 1
+        # Thumbnails are only cached once a post references them, otherwise
+        # Bluesky may garbage-collect the blob
+        blob_cache = load_blob_cache()
+        known_blobs = set(blob_cache)
+        card = payload['card']
+        embed = build_link_card_embed(client, card, blob_cache) if card else None
+        post = payload['post']
+        record = models.AppBskyFeedPost.Record(
+            created_at=client.get_current_time_iso(),
+            text=post.text,
+            facets=to_atproto_facets(post.facets) or None,
+            embed=embed,
+            langs=['en'],
+        )
+        response = client.app.bsky.feed.post.create(client.me.did, record, rkey=payload['rkey'])
+        if set(blob_cache) != known_blobs:
+            save_blob_cache(blob_cache)
+        return {'uri': response.uri}
+
+
+class MastodonTarget(Target):
+    """A Mastodon account, posting through the statuses API."""
+
+    name = "mastodon"
+    rate_per_minute = 30
+
+    def __init__(self, instance, token, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.instance = instance.rstrip('/')
+        self.token = token
+        self.session = session or requests.Session()
+
+    def render(self, announcement):
+        # Mastodon builds its own preview card from the page's OpenGraph tags
+        return compose_post(announcement.title, announcement.summary, announcement.url, announcement.tags,
+                            max_graphemes=MASTODON_MAX_CHARS, max_bytes=4 * MASTODON_MAX_CHARS).text
+
+    def send(self, payload, announcement):
+        response = self.session.post(
+            f"{self.instance}/api/v1/statuses",
+            data={'status': payload, 'visibility': 'public'},
+            headers={
+                'Authorization': f"Bearer {self.token}",
+                # Mastodon ignores repeated requests with the same key, so a
+                # retry after a lost response cannot post twice
+                'Idempotency-Key': hashlib.sha256(f"{announcement.post_id}|{announcement.url}".encode()).hexdigest(),
+            },
+            timeout=REQUEST_TIMEOUT,
+        )
+        response.raise_for_status()
+        status = response.json()
+        return {'id': status.get('id'), 'uri': status.get('url') or status.get('uri')}
+
+
+class WebhookTarget(Target):
+    """A generic JSON webhook, optionally signed with HMAC-SHA256."""
+
+    name = "webhook"
+    rate_per_minute = 60
+
+    def __init__(self, url, secret=None, session=None, **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.secret = secret
+        self.session = session or requests.Session()
+
+    def render(self, announcement):
+        payload = announcement._asdict()
+        payload['text'] = compose_post(announcement.title, announcement.summary, announcement.url,
+                                       announcement.tags).text
+        return payload
+
+    def send(self, payload, announcement):
+        body = json.dumps(payload, sort_keys=True).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.secret:
+            signature = hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+            headers['X-Signature-256'] = f"sha256={signature}"
+        response = self.session.post(self.url, data=body, headers=headers, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return {'status': response.status_code}
+
+
+def configured_targets(environ=None):
+    """Return the targets whose credentials are set in the environment."""
+    environ = os.environ if environ is None else environ
+    targets = []
+    if environ.get('BLUESKY_IDENTIFIER') and environ.get('BLUESKY_PASSWORD'):
+        targets.append(BlueskyTarget(environ['BLUESKY_IDENTIFIER'], environ['BLUESKY_PASSWORD'],
+                                     base_url=environ.get('BLUESKY_SERVICE') or None))
+    if environ.get('MASTODON_INSTANCE') and environ.get('MASTODON_TOKEN'):
+        targets.append(MastodonTarget(environ['MASTODON_INSTANCE'], environ['MASTODON_TOKEN']))
+    if environ.get('ANNOUNCE_WEBHOOK_URL'):
+        targets.append(WebhookTarget(environ['ANNOUNCE_WEBHOOK_URL'], environ.get('ANNOUNCE_WEBHOOK_SECRET')))
+    return targets
+
+
+def posted_targets(entry):
+    """Return the names of the targets a posted-log entry was announced on."""
+    if not entry:
+        return set()
+    if 'targets' in entry:
+        return set(entry['targets'])
+    return {LEGACY_TARGET} if entry.get('posted_at') else set()
+
+
+def record_post(posted_log, announcement, target, fields):
+    """Record a successful announcement on target in the posted log."""
+    now = datetime.now(timezone.utc).isoformat()
+    entry = posted_log.setdefault(announcement.post_id, {})
+    if 'targets' not in entry:
+        # Keep what older entries already said about Bluesky
+        entry['targets'] = {LEGACY_TARGET: {'posted_at': entry['posted_at']}} if entry.get('posted_at') else {}
+    entry['targets'][target] = {'posted_at': now, **{k: v for k, v in fields.items() if v is not None}}
+    entry.setdefault('posted_at', now)
+    entry['title'] = announcement.title
+    entry['url'] = announcement.url
+    return entry
+
+
+def fan_out(announcements, targets, posted_log, save_log=None):
+    """Publish announcements on all targets concurrently.
+
+    Each target works through the announcements it has not posted yet in its
+    own thread. Successes are written to posted_log (and saved through
+    save_log) as they happen, so an interrupted run never repeats a post.
+    Returns {target: {"posted": n, "failed": n, "skipped": n}}.
+    """
+    lock = threading.Lock()
+
+    def run(target):
+        counts = {'posted': 0, 'failed': 0, 'skipped': 0}
+        for announcement in announcements:
+            with lock:
+                done = target.name in posted_targets(posted_log.get(announcement.post_id))
+            if done:
+                counts['skipped'] += 1
+                continue
+            try:
+                fields = target.publish(announcement)
+            except Exception as e:
+                counts['failed'] += 1
+                print(f"  [{target.name}] ❌ Failed to post {announcement.title}: {e}")
+                continue
+            with lock:
+                record_post(posted_log, announcement, target.name, fields)
+                if save_log:
+                    save_log(posted_log)
+            counts['posted'] += 1
+            print(f"  [{target.name}] ✅ Posted and logged: {announcement.title}")
+        return counts
+
+    if not targets:
+        return {}
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        futures = {target.name: pool.submit(run, target) for target in targets}
+    return {name: future.result() for name, future in futures.items()}
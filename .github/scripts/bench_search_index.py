@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark the sharded search index against the single search_index.json.
+For every query it reports the bytes a first-time visitor downloads and the
+first-query latency (transfer at a given bandwidth plus load and query time).
+"""
+
+import argparse
+import gzip
+import json
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from build_search_shards import (
+    SEARCH_INDEX, SHARDS_DIR, SITE_DIR, shard_filename, shard_key, strip_html, tokenize,
+)
+
+DEFAULT_QUERIES = ["nautobot", "containerlab lab", "ansible role docker", "pyats", "zero to hero"]
+DEFAULT_BANDWIDTH_KBPS = 1600  # "Fast 3G" profile used by browser dev tools
+
+
+def transfer_size(path):
+    """Return the raw and gzip-compressed size of a file."""
+    data = Path(path).read_bytes()
+    return len(data), len(gzip.compress(data))
+
+
+def bench_single(site_dir, query):
+    """Load the whole index, build term postings like the search worker and query."""
+    index_file = Path(site_dir) / SEARCH_INDEX
+    start = time.perf_counter()
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    separator = re.compile(index['config'].get('separator', r'[\s\-]+'))
+    postings = defaultdict(set)
+    for doc_id, doc in enumerate(index['docs']):
+        text = ' '.join([strip_html(doc.get('title', '')), strip_html(doc.get('text', ''))]
+                        + (doc.get('tags') or []))
+        for term in tokenize(text, separator):
+            postings[term].add(doc_id)
+    hits = None
+    for term in tokenize(query, separator):
+        matches = postings.get(term, set())
+        hits = matches if hits is None else hits & matches
+    elapsed = time.perf_counter() - start
+    return [index_file], elapsed, len(hits or ())
+
+
+def bench_sharded(site_dir, query):
+    """Load the manifest and only the shards and chunks the query needs."""
+    shards_dir = Path(site_dir) / SHARDS_DIR
+    files = [shards_dir / 'manifest.json']
+    start = time.perf_counter()
+    manifest = json.loads(files[0].read_text(encoding='utf-8'))
+    separator = re.compile(manifest['separator'])
+    available = set(manifest['shards'])
+    hits = None
+    for term in tokenize(query, separator):
+        key = shard_key(term)
+        matches = set()
+        if key in available:
+            shard_file = shards_dir / 'terms' / shard_filename(key)
+            if shard_file not in files:
+                files.append(shard_file)
+            postings = json.loads(shard_file.read_text(encoding='utf-8')).get(term, [])
+            matches = set(postings[::2])
+        hits = matches if hits is None else hits & matches
+    starts = manifest['chunks']
+    for doc_id in sorted(hits or ())[:10]:
+        name = max((chunk for chunk in starts if chunk[1] <= doc_id), key=lambda chunk: chunk[1])[0]
+        chunk_file = shards_dir / 'docs' / shard_filename(name)
+        if chunk_file not in files:
+            files.append(chunk_file)
+            json.loads(chunk_file.read_text(encoding='utf-8'))
+    elapsed = time.perf_counter() - start
+    return files, elapsed, len(hits or ())
+
+
+def main():
+    """Compare first-query cost of both index layouts."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--site-dir', default=SITE_DIR, help='Built MkDocs site directory')
+    parser.add_argument('--query', action='append', help='Query to benchmark (repeatable)')
+    parser.add_argument('--bandwidth-kbps', type=int, default=DEFAULT_BANDWIDTH_KBPS,
+                        help='Download bandwidth used to estimate transfer time')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    if not (Path(args.site_dir) / SHARDS_DIR / 'manifest.json').exists():
+        print("❌ No sharded index found, run build_search_shards.py first")
+        return 1
+    with open(Path(args.site_dir) / SEARCH_INDEX, 'r', encoding='utf-8') as f:
+        if not json.load(f).get('docs'):
+            print(f"❌ {SEARCH_INDEX} is empty (stubbed with --stub-index?), benchmark before stubbing it")
+            return 1
+
+    bytes_per_second = args.bandwidth_kbps * 1000 / 8
+    results = []
+    for query in args.query or DEFAULT_QUERIES:
+        row = {'query': query}
+        for name, bench in (('single', bench_single), ('sharded', bench_sharded)):
+            files, elapsed, hits = bench(args.site_dir, query)
+            raw = sum(transfer_size(f)[0] for f in files)
+            gz = sum(transfer_size(f)[1] for f in files)
+            row[name] = {
+                'requests': len(files),
+                'bytes': raw,
+                'gzip_bytes': gz,
+                'compute_ms': round(elapsed * 1000, 2),
+                'first_query_ms': round((gz / bytes_per_second + elapsed) * 1000, 2),
+                'hits': hits,
+            }
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"📊 First-query cost at {args.bandwidth_kbps} kbit/s (gzip transfer)")
+    print("=" * 80)
+    for row in results:
+        single, sharded = row['single'], row['sharded']
+        print(f"🔍 {row['query']!r}")
+        for name, data in (('single', single), ('sharded', sharded)):
+            print(f"   {name:8} {data['requests']:3} req  {data['gzip_bytes']:>10,} B gz  "
+                  f"{data['first_query_ms']:>9,.1f} ms  ({data['hits']} hits)")
+        saved = 1 - sharded['gzip_bytes'] / single['gzip_bytes'] if single['gzip_bytes'] else 0
+        print(f"   ✅ {saved:.0%} fewer bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
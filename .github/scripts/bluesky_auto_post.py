@@ -1,19 +1,23 @@
 #!/usr/bin/env python3
 """
 Auto-post to Bluesky when blog posts are published.
-This script checks for blog posts that were published today and posts them to Bluesky.
+This script checks for blog posts that were published today and announces them
+on every configured network (Bluesky, Mastodon, webhook) concurrently.
 """
 
-import os
 import re
 import yaml
-import requests
 from datetime import datetime, timezone
 from pathlib import Path
-from atproto import Client, models
-from atproto_client.utils.text_builder import TextBuilder
+import argparse
 import json
 
+from announce_queue import is_immediate, load_config, load_queue, next_release, release_due, save_queue, sync_queue
+from announce_targets import Announcement, configured_targets, fan_out, posted_targets
+from bluesky_composer import compose_many, compose_post
+import instrumentation
+from instrumentation import count, stage, timed
+
 # Configuration
 BLOG_POSTS_DIR = "docs/blog/posts"
 POSTED_LOG_FILE = ".github/scripts/posted_to_bluesky.json"
@@ -27,6 +31,7 @@ def load_posted_log():
             return json.load(f)
     return {}
 
+@timed("write_log")
 def save_posted_log(log):
     """Save the log of posted posts."""
     log_file = Path(POSTED_LOG_FILE)
@@ -34,10 +39,13 @@ def save_posted_log(log):
     with open(log_file, 'w') as f:
         json.dump(log, f, indent=2)
 
+@timed("parse")
 def extract_front_matter(file_path):
     """Extract YAML front matter from a markdown file."""
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
+    count("files_read")
+    count("bytes_read", len(content.encode('utf-8')))
     
     # Match YAML front matter between --- markers
     match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
@@ -48,6 +56,7 @@ def extract_front_matter(file_path):
             return None
     return None
 
+@timed("slug")
 def get_post_url(file_path, front_matter=None):
     """Generate the URL for a blog post."""
     # If we have front matter with a title, use that to generate the URL
@@ -109,138 +118,45 @@ def get_post_url(file_path, front_matter=None):
         url = url.replace('https:/', 'https://', 1)
     return url
 
-def format_bluesky_post(title, summary, url, tags):
-    """Format a blog post for Bluesky with proper link facets."""
-    # Bluesky has a 300 character limit
-    max_length = 300
-    
-    # Create the post content
-    post_content = f"New blog post online!: {title}\n\n"
-    
-    if summary:
-        # Truncate summary if too long
-        max_summary_length = max_length - len(post_content) - len(url) - 20  # Reserve space for tags and URL
-        if len(summary) > max_summary_length:
-            summary = summary[:max_summary_length-3] + "..."
-        post_content += f"{summary}\n\n"
-    
-    # Add tags if there's space (limit to 3 tags)
-    if tags and len(post_content) < max_length - len(url) - 30:
-        tag_text = " ".join([f"#{tag.replace('-', '').replace(' ', '')}" for tag in tags[:3]])
-        if len(post_content + f"{tag_text}\n\n") <= max_length - len(url) - 5:
-            post_content += f"{tag_text}\n\n"
-    
-    # Add URL on its own line for better clickability
-    post_content += f"{url}"
-    
-    # Truncate if too long
-    if len(post_content) > max_length:
-        # Try to truncate summary first
-        if summary and len(summary) > 20:
-            # Calculate how much to truncate
-            excess = len(post_content) - max_length
-            new_summary = summary[:-excess-3] + "..."
-            post_content = f"New blog post online!: {title}\n\n{new_summary}\n\n{url}"
-        else:
-            # If no summary or can't truncate further, truncate title
-            post_content = post_content[:max_length-3] + "..."
-    
-    return post_content
-
-def create_bluesky_post_with_facets(title, summary, url, tags):
-    """Create a Bluesky post with proper link facets for clickable URLs."""
-    # Bluesky has a 300 character limit
-    max_length = 300
-    
-    # Reserve space for the URL (always keep it complete)
-    url_length = len(url)
-    available_length = max_length - url_length - 10  # Reserve 10 chars for formatting
-    
-    # Build the text content
-    tb = TextBuilder()
-    
-    # Add title (truncate if necessary)
-    title_text = f"New blog post online!: {title}\n\n"
-    if len(title_text) > available_length:
-        # Truncate title to fit
-        max_title_length = available_length - 10  # Reserve space for summary
-        truncated_title = title[:max_title_length-3] + "..."
-        title_text = f"New blog post online!: {truncated_title}\n\n"
-    
-    tb.text(title_text)
-    available_length -= len(title_text)
-    
-    # Add summary if available and there's space
-    if summary and available_length > 20:
-        # Truncate summary if too long
-        if len(summary) > available_length - 10:  # Reserve space for tags
-            summary = summary[:available_length-13] + "..."
-        tb.text(f"{summary}\n\n")
-        available_length -= len(summary) + 2  # +2 for \n\n
-    
-    # Add tags if there's space (limit to 3 tags)
-    if tags and available_length > 15:
-        tag_text = " ".join([f"#{tag.replace('-', '').replace(' ', '')}" for tag in tags[:3]])
-        if len(tag_text) <= available_length - 5:
-            tb.text(f"{tag_text}\n\n")
-            available_length -= len(tag_text) + 2  # +2 for \n\n
-    
-    # Add the URL as a clickable link (always complete)
-    tb.link(url, url)
-    
-    # Get the text and facets
-    post_text = tb.build_text()
-    post_facets = tb.build_facets()
-    
-    # Verify the URL is complete in the final text
-    if url not in post_text:
-        # If URL was truncated, rebuild with minimal content
-        tb = TextBuilder()
-        tb.text(f"New blog post online!: {title[:50]}...\n\n")
-        tb.link(url, url)
-        post_text = tb.build_text()
-        post_facets = tb.build_facets()
-    
-    return post_text, post_facets
+def load_archive_posts():
+    """Load every blog post with the fields needed to announce it."""
+    posts = []
+    for md_file in sorted(Path(BLOG_POSTS_DIR).rglob("*.md")):
+        front_matter = extract_front_matter(md_file)
+        if not front_matter or 'date' not in front_matter:
+            continue
+        posts.append({
+            'post_id': str(md_file),
+            'file': md_file,
+            'front_matter': front_matter,
+            'title': front_matter.get('title', 'Untitled'),
+            'summary': front_matter.get('summary', ''),
+            'tags': front_matter.get('tags', []),
+            'url': get_post_url(md_file, front_matter),
+        })
+    return posts
 
-def post_to_bluesky(content, facets=None):
-    """Post content to Bluesky using the atproto library."""
-    identifier = os.environ.get('BLUESKY_IDENTIFIER')
-    password = os.environ.get('BLUESKY_PASSWORD')
-    
-    if not identifier or not password:
-        print("❌ Bluesky credentials not found in environment variables")
-        print("🔍 Would post this content:")
+def preview_archive():
+    """Compose the announcement of every post in the archive without posting."""
+    composed = compose_many(load_archive_posts())
+    for post_id, post in composed.items():
+        print(f"📄 {post_id} ({post.graphemes} graphemes, {post.bytes} bytes)")
         print("---")
-        print(content)
-        if facets:
-            print("With facets:", facets)
+        print(post.text)
         print("---")
-        return False
-    
-    try:
-        client = Client()
-        client.login(identifier, password)
-        
-        # Post to Bluesky with facets if provided
-        if facets:
-            response = client.send_post(text=content, facets=facets)
-        else:
-            response = client.send_post(text=content)
-        print(f"✅ Posted to Bluesky: {response.uri}")
-        return True
-        
-    except Exception as e:
-        print(f"❌ Failed to post to Bluesky: {e}")
-        return False
+    print(f"✅ Composed {len(composed)} posts")
 
-def main():
-    """Main function to check for new posts and post them to Bluesky."""
+def main(args=None):
+    """Main function to check for new posts and announce them on every target."""
     print("🔍 Checking for newly published blog posts...")
     
     # Load the log of already posted content
     posted_log = load_posted_log()
     
+    targets = configured_targets()
+    target_names = [target.name for target in targets]
+    print(f"📡 Targets: {', '.join(target_names) or 'none configured (dry run)'}")
+    
     # Get today's date
     today = datetime.now(timezone.utc).date()
     print(f"📅 Today's date: {today}")
@@ -254,7 +170,10 @@ def main():
     new_posts = []
     found_posts = 0
     
-    for md_file in blog_dir.rglob("*.md"):
+    with stage("scan"):
+        md_files = list(blog_dir.rglob("*.md"))
+    
+    for md_file in md_files:
         # Skip the log file itself
         if "posted_to_bluesky" in str(md_file):
             continue
@@ -288,8 +207,11 @@ def main():
             post_id = str(md_file)
             print(f"  🔍 Checking post ID: {post_id}")
             
-            # Check if this post is already in the log
-            if post_id not in posted_log:
+            # Check which targets have not announced this post yet
+            posted = posted_targets(posted_log.get(post_id))
+            pending = [name for name in target_names if name not in posted] if targets else \
+                ([] if posted else ['dry run'])
+            if pending:
                 # Check if it's not a draft
                 if not front_matter.get('draft', False):
                     new_posts.append({
@@ -297,7 +219,7 @@ def main():
                         'front_matter': front_matter,
                         'post_id': post_id
                     })
-                    print(f"  ✅ Added to posting queue")
+                    print(f"  ✅ Added to posting queue ({', '.join(pending)})")
                 else:
                     print(f"  📝 Draft post (skipping)")
             else:
@@ -307,39 +229,87 @@ def main():
     
     print(f"📊 Summary: Found {found_posts} posts, {len(new_posts)} ready to post")
     
-    if not new_posts:
+    # Only the newest posts go out immediately, older ones are backfilled
+    config = load_config()
+    if args and args.backfill_rate is not None:
+        config['rate'] = args.backfill_rate
+    if args and args.backfill_interval is not None:
+        config['interval_hours'] = args.backfill_interval
+    immediate, backlog = [], {}
+    for post in new_posts:
+        if is_immediate(post['front_matter'], today, config):
+            immediate.append(post)
+        else:
+            backlog[post['post_id']] = post
+    
+    queue = load_queue()
+    added, removed = sync_queue(queue, list(backlog.values()), today, config)
+    print(f"🗃️ Backfill queue: {len(queue['entries'])} posts ({added} added, {removed} removed)")
+    released = release_due(queue, datetime.now(timezone.utc), config)
+    for post_id in released:
+        print(f"  ⏩ Released from backfill queue: {queue['entries'][post_id]['title']} "
+              f"(priority {queue['entries'][post_id]['priority']})")
+    if queue['entries'] and not released:
+        print(f"  ⏳ Next backfill release: {next_release(queue, config).isoformat()}")
+    
+    to_post = immediate + [backlog[post_id] for post_id in released]
+    if not to_post:
+        if targets:
+            save_queue(queue)
         print("✅ No new posts to publish today")
         return
     
-    print(f"📝 Found {len(new_posts)} new posts to publish:")
+    print(f"📝 Found {len(to_post)} new posts to publish:")
+    
+    announcements = []
+    for post in to_post:
+        front_matter = post['front_matter']
+        announcement = Announcement.from_post({
+            'post_id': post['post_id'],
+            'title': front_matter.get('title', 'Untitled'),
+            'summary': front_matter.get('summary', ''),
+            'tags': front_matter.get('tags', []),
+            'url': get_post_url(post['file'], front_matter),
+        })
+        announcements.append(announcement)
+        print(f"  - {announcement.title}")
+        print(f"    URL: {announcement.url}")
+    
+    if not targets:
+        print("❌ No announcement targets configured in environment variables")
+        for announcement in announcements:
+            print("🔍 Would post this content:")
+            print("---")
+            print(compose_post(announcement.title, announcement.summary, announcement.url, announcement.tags).text)
+            print("---")
+        return
     
-    for post in new_posts:
-        title = post['front_matter'].get('title', 'Untitled')
-        summary = post['front_matter'].get('summary', '')
-        tags = post['front_matter'].get('tags', [])
-        url = get_post_url(post['file'], post['front_matter'])
-        
-        print(f"  - {title}")
-        print(f"    URL: {url}")
-        
-        # Format the post for Bluesky with proper link facets for clickable URLs
-        bluesky_content, bluesky_facets = create_bluesky_post_with_facets(title, summary, url, tags)
-        
-        # Post to Bluesky
-        if post_to_bluesky(bluesky_content, bluesky_facets):
-            # Mark as posted with current timestamp
-            posted_log[post['post_id']] = {
-                'posted_at': datetime.now(timezone.utc).isoformat(),
-                'title': title,
-                'url': url
-            }
-            # Save the log immediately after each successful post
-            save_posted_log(posted_log)
-            print(f"  ✅ Posted and logged: {title}")
-        else:
-            print(f"  ❌ Failed to post: {title}")
+    # Every target works through its own queue; successes are logged as they happen
+    with stage("publish"):
+        results = fan_out(announcements, targets, posted_log, save_posted_log)
+    for name, counts in results.items():
+        print(f"📊 {name}: {counts['posted']} posted, {counts['failed']} failed, {counts['skipped']} already posted")
+    
+    # Released posts that failed somewhere stay queued for the next release
+    for post_id in released:
+        if set(target_names) <= posted_targets(posted_log.get(post_id)):
+            queue['entries'].pop(post_id, None)
+    save_queue(queue)
     
     print("✅ All posts processed")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--preview-all', action='store_true',
+                        help='Print the announcement of every post in the archive and exit')
+    parser.add_argument('--backfill-rate', type=int,
+                        help='Posts released from the backfill queue per release (overrides announce_backfill.yml)')
+    parser.add_argument('--backfill-interval', type=float,
+                        help='Hours between backfill releases (overrides announce_backfill.yml)')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    with instrumentation.instrumented("bluesky_auto_post", args):
+        if args.preview_all:
+            preview_archive()
+        else:
+            main(args)
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Compose Bluesky announcement posts in a single pass.
+Bluesky limits posts to 300 graphemes (and 3000 UTF-8 bytes) and facets
+point at UTF-8 byte offsets, so this module measures both exactly instead of
+using len(). The title, summary and tags are fitted in that priority order
+around the fixed header and the always-complete URL.
+"""
+
+import unicodedata
+from typing import NamedTuple
+
+try:
+    import regex
+except ImportError:  # optional, gives full UAX #29 segmentation
+    regex = None
+
+# Configuration
+MAX_GRAPHEMES = 300
+MAX_BYTES = 3000
+HEADER = "New blog post online!: "
+SEPARATOR = "\n\n"
+ELLIPSIS = "…"
+MAX_TAGS = 3
+MIN_SUMMARY_GRAPHEMES = 20
+
+LINK_FEATURE = "app.bsky.richtext.facet#link"
+TAG_FEATURE = "app.bsky.richtext.facet#tag"
+
+ZWJ = "\u200d"
+
+
+class ComposedPost(NamedTuple):
+    """A post ready to send: text, facets (byte offsets) and its measured size."""
+    text: str
+    facets: list
+    graphemes: int
+    bytes: int
+
+
+def _is_extend(char):
+    """Characters that never start a grapheme cluster of their own."""
+    code = ord(char)
+    return (
+        unicodedata.category(char) in ("Mn", "Me", "Mc")
+        or char == ZWJ
+        or 0xFE00 <= code <= 0xFE0F        # variation selectors
+        or 0xE0100 <= code <= 0xE01EF
+        or 0x1F3FB <= code <= 0x1F3FF      # emoji skin tone modifiers
+        or 0xE0020 <= code <= 0xE007F      # emoji tag sequences (flags)
+    )
+
+
+def _is_pictographic(char):
+    """Approximation of Extended_Pictographic for emoji ZWJ sequences."""
+    code = ord(char)
+    return (
+        0x1F000 <= code <= 0x1FAFF
+        or 0x2600 <= code <= 0x27BF
+        or 0x2300 <= code <= 0x23FF
+        or 0x2B00 <= code <= 0x2BFF
+        or code in (0x00A9, 0x00AE, 0x203C, 0x2049, 0x2122, 0x2139, 0x3030, 0x303D, 0x3297, 0x3299)
+    )
+
+
+def _is_regional_indicator(char):
+    return 0x1F1E6 <= ord(char) <= 0x1F1FF
+
+
+def _hangul_type(char):
+    """Return the Hangul syllable type (L, V, T, LV, LVT) or None."""
+    code = ord(char)
+    if 0x1100 <= code <= 0x115F or 0xA960 <= code <= 0xA97C:
+        return "L"
+    if 0x1160 <= code <= 0x11A7 or 0xD7B0 <= code <= 0xD7C6:
+        return "V"
+    if 0x11A8 <= code <= 0x11FF or 0xD7CB <= code <= 0xD7FB:
+        return "T"
+    if 0xAC00 <= code <= 0xD7A3:
+        return "LV" if (code - 0xAC00) % 28 == 0 else "LVT"
+    return None
+
+
+def _joins(previous, char, cluster):
+    """Return True if char continues the cluster ending in previous."""
+    if previous == "\r" and char == "\n":
+        return True
+    if previous in "\r\n" or char in "\r\n":
+        return False
+    if _is_extend(char):
+        return True
+    if previous == ZWJ and _is_pictographic(char):
+        return True
+    if _is_regional_indicator(previous) and _is_regional_indicator(char):
+        # Flags are pairs: only join an odd-length run
+        run = 0
+        for c in reversed(cluster):
+            if not _is_regional_indicator(c):
+                break
+            run += 1
+        return run % 2 == 1
+    before, after = _hangul_type(previous), _hangul_type(char)
+    if before == "L" and after in ("L", "V", "LV", "LVT"):
+        return True
+    if before in ("LV", "V") and after in ("V", "T"):
+        return True
+    if before in ("LVT", "T") and after == "T":
+        return True
+    return False
+
+
+def graphemes(text):
+    """Split text into user-perceived characters (extended grapheme clusters)."""
+    if regex is not None:
+        return regex.findall(r"\X", text)
+    clusters = []
+    for char in text:
+        if clusters and _joins(clusters[-1][-1], char, clusters[-1]):
+            clusters[-1] += char
+        else:
+            clusters.append(char)
+    return clusters
+
+
+def grapheme_len(text):
+    """Number of graphemes Bluesky counts for text."""
+    return len(graphemes(text))
+
+
+def byte_len(text):
+    """Number of UTF-8 bytes of text."""
+    return len(text.encode("utf-8"))
+
+
+def hashtag(tag):
+    """Turn a front matter tag into a hashtag word."""
+    return str(tag).replace("-", "").replace(" ", "")
+
+
+def fit(text, max_graphemes, max_bytes):
+    """Return text, or its longest prefix plus an ellipsis, within both budgets."""
+    if grapheme_len(text) <= max_graphemes and byte_len(text) <= max_bytes:
+        return text
+    max_graphemes -= 1
+    max_bytes -= byte_len(ELLIPSIS)
+    if max_graphemes < 1 or max_bytes < 1:
+        return ""
+    kept, used = [], 0
+    for cluster in graphemes(text)[:max_graphemes]:
+        size = byte_len(cluster)
+        if used + size > max_bytes:
+            break
+        kept.append(cluster)
+        used += size
+    return "".join(kept).rstrip() + ELLIPSIS
+
+
+def compose_post(title, summary, url, tags, max_graphemes=MAX_GRAPHEMES, max_bytes=MAX_BYTES):
+    """Compose an announcement with a complete, clickable URL.
+
+    The header, the separators and the URL are fixed costs. What is left is
+    given to the title first, then the summary, then as many whole tags as
+    fit. Every part is measured once, so there is no rebuild or fallback.
+    """
+    title = " ".join(str(title or "Untitled").split())
+    summary = " ".join(str(summary or "").split())
+
+    graphemes_left = max_graphemes - grapheme_len(HEADER) - grapheme_len(SEPARATOR) - grapheme_len(url)
+    bytes_left = max_bytes - byte_len(HEADER) - byte_len(SEPARATOR) - byte_len(url)
+
+    title = fit(title, graphemes_left, bytes_left)
+    graphemes_left -= grapheme_len(title)
+    bytes_left -= byte_len(title)
+    segments = [(HEADER + title + SEPARATOR, None)]
+
+    sep_graphemes, sep_bytes = grapheme_len(SEPARATOR), byte_len(SEPARATOR)
+    if summary and graphemes_left - sep_graphemes >= MIN_SUMMARY_GRAPHEMES:
+        summary = fit(summary, graphemes_left - sep_graphemes, bytes_left - sep_bytes)
+        segments.append((summary + SEPARATOR, None))
+        graphemes_left -= grapheme_len(summary) + sep_graphemes
+        bytes_left -= byte_len(summary) + sep_bytes
+
+    tag_segments = []
+    for tag in (tags or [])[:MAX_TAGS]:
+        word = hashtag(tag)
+        if not word:
+            continue
+        text = "#" + word
+        # A space before every tag but the first, the separator after the last
+        cost_graphemes = grapheme_len(text) + (1 if tag_segments else sep_graphemes)
+        cost_bytes = byte_len(text) + (1 if tag_segments else sep_bytes)
+        if cost_graphemes > graphemes_left or cost_bytes > bytes_left:
+            continue
+        if tag_segments:
+            tag_segments.append((" ", None))
+        tag_segments.append((text, {"$type": TAG_FEATURE, "tag": word}))
+        graphemes_left -= cost_graphemes
+        bytes_left -= cost_bytes
+    if tag_segments:
+        segments.extend(tag_segments)
+        segments.append((SEPARATOR, None))
+
+    segments.append((url, {"$type": LINK_FEATURE, "uri": url}))
+
+    # Single pass over the segments to build the text and byte offsets
+    text, facets, offset = [], [], 0
+    for chunk, feature in segments:
+        size = byte_len(chunk)
+        if feature:
+            facets.append({"index": {"byteStart": offset, "byteEnd": offset + size}, "features": [feature]})
+        text.append(chunk)
+        offset += size
+    text = "".join(text)
+    return ComposedPost(text, facets, grapheme_len(text), offset)
+
+
+def compose_many(posts):
+    """Compose every post of an archive.
+
+    posts is an iterable of dicts with post_id, title, summary, url and tags;
+    the result maps each post_id to its ComposedPost.
+    """
+    return {
+        post["post_id"]: compose_post(post.get("title"), post.get("summary"), post["url"], post.get("tags"))
+        for post in posts
+    }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Build Bluesky link cards (app.bsky.embed.external) from the built site.
+The title, description and og:image are read from the page in site/, so no
+live HTTP scraping is needed. Thumbnails are uploaded once: the blob reference
+returned by Bluesky is cached under the SHA-256 of the image bytes and reused
+by every later announcement of the same image. Posts are looked up through
+site/page-manifest.json by their source file, so the card points at the page
+the blog plugin actually built, whatever slug get_post_url derives.
+"""
+
+import hashlib
+import json
+import mimetypes
+from functools import lru_cache
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from instrumentation import count
+
+# Configuration
+SITE_DIR = "site"
+DOCS_DIR = "docs"
+MANIFEST_FILE = "page-manifest.json"
+SITE_URL = "https://netdevops.it"
+BLOB_CACHE_FILE = ".cache/bluesky/blobs.json"
+# Bluesky rejects thumbnails above 1 MB
+MAX_THUMB_BYTES = 1_000_000
+MAX_DESCRIPTION = 300
+
+EXTERNAL_EMBED = "app.bsky.embed.external"
+
+
+class MetaCollector(HTMLParser):
+    """Collect the <title> and the meta tags of a page's head."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.title = ""
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta':
+            name = attrs.get('property') or attrs.get('name')
+            if name and attrs.get('content') is not None:
+                self.meta.setdefault(name.lower(), attrs['content'])
+        elif tag == 'title':
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+
+def site_file(url, site_dir=SITE_DIR):
+    """Return the file in the built site for a URL of this site, or None for other sites."""
+    parts = urlsplit(url)
+    if f"{parts.scheme}://{parts.netloc}" != SITE_URL:
+        return None
+    return Path(site_dir) / unquote(parts.path).lstrip('/')
+
+
+def page_file(url, site_dir=SITE_DIR):
+    """Return the built HTML page for a URL of this site."""
+    path = site_file(url, site_dir)
+    if path is not None and path.suffix != '.html':
+        path = path / 'index.html'
+    return path
+
+
+@lru_cache(maxsize=None)
+def manifest_pages(site_dir=SITE_DIR):
+    """Return {source path: manifest entry} from the built site's page manifest."""
+    manifest_file = Path(site_dir) / MANIFEST_FILE
+    if not manifest_file.is_file():
+        return {}
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return {page['src']: page for page in json.load(f).get('pages', [])}
+
+
+def built_page(post_id, site_dir=SITE_DIR):
+    """Return (url, html file) of the page built from a post's source file, or None."""
+    src = Path(post_id).as_posix()
+    if src.startswith(f"{DOCS_DIR}/"):
+        src = src[len(DOCS_DIR) + 1:]
+    page = manifest_pages(str(site_dir)).get(src)
+    if page is None:
+        return None
+    return f"{SITE_URL}/{page['url']}", Path(site_dir) / page['dest']
+
+
+def read_link_card(url, site_dir=SITE_DIR, post_id=None):
+    """Read the card fields for url from the built site.
+
+    With post_id the page is found through the page manifest and the card
+    links to its built URL; url is only used when the manifest does not know
+    the post. Returns a dict with uri, title, description and image (the
+    local path of the thumbnail or None), or None when the page is not in the
+    built site.
+    """
+    built = built_page(post_id, site_dir) if post_id else None
+    if built:
+        url, path = built
+    else:
+        path = page_file(url, site_dir)
+    if path is None or not path.is_file():
+        return None
+    html = path.read_text(encoding='utf-8', errors='replace')
+    count("files_read")
+    count("bytes_read", len(html.encode('utf-8')))
+    collector = MetaCollector()
+    collector.feed(html)
+    meta = collector.meta
+
+    image = site_file(meta['og:image'], site_dir) if meta.get('og:image') else None
+    if image is not None and not image.is_file():
+        image = None
+
+    description = meta.get('og:description') or meta.get('description') or ""
+    if len(description) > MAX_DESCRIPTION:
+        description = description[:MAX_DESCRIPTION - 1].rstrip() + "…"
+    return {
+        'uri': url,
+        'title': meta.get('og:title') or collector.title.strip(),
+        'description': description,
+        'image': image,
+    }
+
+
+def load_blob_cache(path=BLOB_CACHE_FILE):
+    """Load the image hash -> blob reference cache."""
+    cache_file = Path(path)
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_blob_cache(cache, path=BLOB_CACHE_FILE):
+    """Save the blob cache."""
+    cache_file = Path(path)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def thumbnail_blob(image, cache, upload):
+    """Return the blob reference for an image, uploading it only if it is new.
+
+    upload is called with the image bytes and must return the blob reference
+    as a lexicon dict ({"$type": "blob", "ref": ..., "mimeType": ..., "size": ...}).
+    Returns (blob, uploaded), or (None, False) for images Bluesky would reject.
+    """
+    data = Path(image).read_bytes()
+    if len(data) > MAX_THUMB_BYTES:
+        return None, False
+    key = hashlib.sha256(data).hexdigest()
+    if key in cache:
+        count("cache_hits")
+        return cache[key]['blob'], False
+    blob = upload(data)
+    cache[key] = {
+        'blob': blob,
+        'file': Path(image).as_posix(),
+        'mime_type': mimetypes.guess_type(str(image))[0],
+    }
+    return blob, True
+
+
+def external_embed(card, thumb=None):
+    """Build the app.bsky.embed.external record for a card."""
+    external = {
+        'uri': card['uri'],
+        'title': card['title'],
+        'description': card['description'],
+    }
+    if thumb:
+        external['thumb'] = thumb
+    return {'$type': EXTERNAL_EMBED, 'external': external}
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Pre-build a sharded search index from the MkDocs search_index.json.
+The single index is split into term-prefix shards (postings) and per-section
+document chunks, so the search UI only downloads the shards a query needs.
+"""
+
+import argparse
+import json
+import re
+from collections import defaultdict
+from html import unescape
+from pathlib import Path
+
+# Configuration
+SITE_DIR = "site"
+SEARCH_INDEX = "search/search_index.json"
+SHARDS_DIR = "search/shards"
+SHARD_FORMAT_VERSION = 1
+PREFIX_LENGTH = 2
+TEASER_LENGTH = 160
+TITLE_BOOST = 10
+CHUNK_SIZE = 100
+
+# Same word list as the lunr stopWordFilter used by the Material search plugin
+STOP_WORDS = frozenset("""
+a able about across after all almost also am among an and any are as at be
+because been but by can cannot could dear did do does either else ever every
+for from get got had has have he her hers him his how however i if in into is
+it its just least let like likely may me might most must my neither no nor not
+of off often on only or other our own rather said say says she should since so
+some than that the their them then there these they this tis to too twas us
+wants was we were what when where which while who whom why will with would yet
+you your
+""".split())
+
+TAG_RE = re.compile(r'<[^>]+>')
+NON_WORD_RE = re.compile(r'[^\w]+')
+
+
+def strip_html(html):
+    """Turn the HTML fragment stored in the search index into plain text."""
+    return re.sub(r'\s+', ' ', unescape(TAG_RE.sub(' ', html or ''))).strip()
+
+
+def tokenize(text, separator):
+    """Split text into lowercase search terms, dropping stop words."""
+    terms = []
+    for chunk in separator.split(text.lower()):
+        for term in NON_WORD_RE.split(chunk):
+            if len(term) >= PREFIX_LENGTH and term not in STOP_WORDS:
+                terms.append(term)
+    return terms
+
+
+def shard_key(term):
+    """Return the shard a term lives in (its first characters)."""
+    return term[:PREFIX_LENGTH]
+
+
+def section_of(location):
+    """Return the section a search document belongs to (first path segment)."""
+    path = location.split('#', 1)[0].strip('/')
+    return path.split('/', 1)[0] if path else 'index'
+
+
+def build_shards(index, chunk_size=None):
+    """Build the manifest, postings shards and document chunks from an index.
+
+    Documents are renumbered so each section is a contiguous id range, then
+    stored in chunks of at most chunk_size documents. The manifest only keeps
+    the first id of every chunk, which keeps the first download small.
+    """
+    chunk_size = chunk_size or CHUNK_SIZE
+    config = index.get('config', {})
+    separator = re.compile(config.get('separator', r'[\s\-]+'))
+
+    entries = []
+    for order, doc in enumerate(index.get('docs', [])):
+        location = doc.get('location', '')
+        entries.append((section_of(location), order, location, doc))
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+    chunks = {}
+    chunk_starts = []
+    postings = defaultdict(lambda: defaultdict(int))
+    previous_section, position = None, 0
+
+    for doc_id, (section, _, location, doc) in enumerate(entries):
+        if section != previous_section or position == chunk_size:
+            if section != previous_section:
+                number = 0
+            name = f'{section}-{number}'
+            number += 1
+            chunk_starts.append([name, doc_id])
+            chunks[name] = []
+            previous_section, position = section, 0
+        position += 1
+
+        title = strip_html(doc.get('title', ''))
+        text = strip_html(doc.get('text', ''))
+        chunks[name].append([location, title, text[:TEASER_LENGTH]])
+
+        for term in tokenize(title, separator):
+            postings[term][doc_id] += TITLE_BOOST
+        for term in tokenize(' '.join(doc.get('tags') or []), separator):
+            postings[term][doc_id] += TITLE_BOOST
+        for term in tokenize(text, separator):
+            postings[term][doc_id] += 1
+
+    # Postings are stored flat as [doc, weight, doc, weight, ...] sorted by doc
+    shards = defaultdict(dict)
+    for term in sorted(postings):
+        flat = []
+        for doc_id, weight in sorted(postings[term].items()):
+            flat.extend((doc_id, weight))
+        shards[shard_key(term)][term] = flat
+
+    manifest = {
+        'version': SHARD_FORMAT_VERSION,
+        'separator': separator.pattern,
+        'prefix': PREFIX_LENGTH,
+        'stopwords': sorted(STOP_WORDS),
+        'count': len(entries),
+        'shards': sorted(shards),
+        'chunks': chunk_starts,
+    }
+    return manifest, dict(shards), chunks
+
+
+def shard_filename(key):
+    """Return a filesystem-safe file name for a shard or chunk key."""
+    return ''.join(c if c.isascii() and (c.isalnum() or c in '-_') else f'~{ord(c):x}' for c in key) + '.json'
+
+
+def dump_compact(data, path):
+    """Write JSON without whitespace."""
+    path.write_text(json.dumps(data, separators=(',', ':'), ensure_ascii=False), encoding='utf-8')
+    return path.stat().st_size
+
+
+def write_shards(site_dir, manifest, shards, chunks):
+    """Write the manifest, postings shards and document chunks below site_dir."""
+    out_dir = Path(site_dir) / SHARDS_DIR
+    if out_dir.exists():
+        for old in out_dir.rglob('*.json'):
+            old.unlink()
+    (out_dir / 'terms').mkdir(parents=True, exist_ok=True)
+    (out_dir / 'docs').mkdir(parents=True, exist_ok=True)
+
+    total = dump_compact(manifest, out_dir / 'manifest.json')
+    for key, terms in shards.items():
+        total += dump_compact(terms, out_dir / 'terms' / shard_filename(key))
+    for name, docs in chunks.items():
+        total += dump_compact(docs, out_dir / 'docs' / shard_filename(name))
+    return total
+
+
+def stub_search_index(index_file, index):
+    """Replace the monolithic index with an empty one the theme can still load."""
+    dump_compact({'config': index.get('config', {}), 'docs': []}, index_file)
+
+
+def main():
+    """Build the sharded search index for a built site."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--site-dir', default=SITE_DIR, help='Built MkDocs site directory')
+    parser.add_argument('--stub-index', action='store_true',
+                        help='Empty search_index.json so visitors only download shards')
+    args = parser.parse_args()
+
+    index_file = Path(args.site_dir) / SEARCH_INDEX
+    if not index_file.exists():
+        print(f"❌ Search index not found: {index_file}")
+        return 1
+
+    print(f"🔍 Reading {index_file} ({index_file.stat().st_size:,} bytes)...")
+    with open(index_file, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+
+    manifest, shards, chunks = build_shards(index)
+    total = write_shards(args.site_dir, manifest, shards, chunks)
+    print(f"📦 Wrote {len(shards)} term shards and {len(chunks)} document chunks "
+          f"for {manifest['count']} documents ({total:,} bytes)")
+
+    if args.stub_index:
+        stub_search_index(index_file, index)
+        print("✂️ Replaced search_index.json with an empty stub")
+
+    print("✅ Sharded search index ready")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Shared stage timing and metrics for the automation scripts.
+Scripts wrap their work in named stages (scan, parse, slug, compose, publish,
+write_log, http_fetch, ...) and bump counters (files_read, bytes_read,
+cache_hits, http_calls, retries). At exit one record per run is appended as a
+JSON line, or written as a Prometheus textfile, so CI runs can be graphed and
+regressions spotted. --profile adds cProfile output.
+
+Usage in a script:
+
+    import instrumentation
+    from instrumentation import count, stage, timed
+
+    @timed("slug")
+    def get_post_url(...):
+        ...
+
+    with stage("parse"):
+        count("files_read")
+        ...
+
+    if __name__ == "__main__":
+        parser = argparse.ArgumentParser()
+        instrumentation.add_arguments(parser)
+        args = parser.parse_args()
+        with instrumentation.instrumented("my_script", args):
+            main()
+"""
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Configuration
+METRICS_FILE_ENV = "METRICS_FILE"
+PROFILE_TOP = 25
+PROMETHEUS_PREFIX = "automation"
+
+_lock = threading.Lock()
+_stages = defaultdict(lambda: {'seconds': 0.0, 'calls': 0})
+_counters = defaultdict(int)
+
+
+@contextmanager
+def stage(name):
+    """Time a block of work under a stage name; repeated and nested stages add up."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _lock:
+            _stages[name]['seconds'] += elapsed
+            _stages[name]['calls'] += 1
+
+
+def timed(name):
+    """Decorator that runs every call of a function inside stage(name)."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """Add value to a counter."""
+    with _lock:
+        _counters[name] += value
+
+
+def snapshot():
+    """Return the stages and counters recorded so far."""
+    with _lock:
+        return ({name: {'seconds': round(s['seconds'], 6), 'calls': s['calls']} for name, s in sorted(_stages.items())},
+                dict(sorted(_counters.items())))
+
+
+def reset():
+    """Forget all recorded stages and counters."""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def add_arguments(parser):
+    """Add --metrics-file and --profile to an argument parser."""
+    parser.add_argument('--metrics-file', default=os.environ.get(METRICS_FILE_ENV),
+                        help="Append a JSON line per run to this file, or write a Prometheus textfile if it "
+                             "ends in .prom; '{script}' is replaced by the script name "
+                             f"(default: ${METRICS_FILE_ENV})")
+    parser.add_argument('--profile', nargs='?', const='-', metavar='FILE',
+                        help='Profile the run with cProfile; print the top functions, or save stats to FILE')
+
+
+def build_record(script, duration, status):
+    """Build the metrics record of a run."""
+    stages, counters = snapshot()
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'script': script,
+        'status': status,
+        'duration_seconds': round(duration, 6),
+        'stages': stages,
+        'counters': counters,
+        'run_id': os.environ.get('GITHUB_RUN_ID'),
+        'sha': os.environ.get('GITHUB_SHA'),
+    }
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(record):
+    """Render a run record in the Prometheus text exposition format."""
+    script = _label(record['script'])
+    lines = [
+        f"# HELP {PROMETHEUS_PREFIX}_run_duration_seconds Wall-clock duration of the last run.",
+        f"# TYPE {PROMETHEUS_PREFIX}_run_duration_seconds gauge",
+        f'{PROMETHEUS_PREFIX}_run_duration_seconds{{script="{script}"}} {record["duration_seconds"]}',
+        f"# HELP {PROMETHEUS_PREFIX}_run_success Whether the last run succeeded.",
+        f"# TYPE {PROMETHEUS_PREFIX}_run_success gauge",
+        f'{PROMETHEUS_PREFIX}_run_success{{script="{script}"}} {int(record["status"] == "ok")}',
+        f"# HELP {PROMETHEUS_PREFIX}_last_run_timestamp_seconds Unix time the last run finished.",
+        f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge",
+        f'{PROMETHEUS_PREFIX}_last_run_timestamp_seconds{{script="{script}"}} '
+        f'{datetime.fromisoformat(record["timestamp"]).timestamp():.3f}',
+        f"# HELP {PROMETHEUS_PREFIX}_stage_seconds Time spent per stage in the last run.",
+        f"# TYPE {PROMETHEUS_PREFIX}_stage_seconds gauge",
+    ]
+    for name, values in record['stages'].items():
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_seconds{{script="{script}",stage="{_label(name)}"}} '
+                     f'{values["seconds"]}')
+    lines += [f"# HELP {PROMETHEUS_PREFIX}_stage_calls Times each stage ran in the last run.",
+              f"# TYPE {PROMETHEUS_PREFIX}_stage_calls gauge"]
+    for name, values in record['stages'].items():
+        lines.append(f'{PROMETHEUS_PREFIX}_stage_calls{{script="{script}",stage="{_label(name)}"}} {values["calls"]}')
+    lines += [f"# HELP {PROMETHEUS_PREFIX}_events Counters of the last run.",
+              f"# TYPE {PROMETHEUS_PREFIX}_events gauge"]
+    for name, value in record['counters'].items():
+        lines.append(f'{PROMETHEUS_PREFIX}_events{{script="{script}",name="{_label(name)}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(record, path):
+    """Append the record as a JSON line, or replace the Prometheus textfile."""
+    path = Path(str(path).replace('{script}', record['script']))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == '.prom':
+        # node_exporter may read the file at any moment, so replace it atomically
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_text(render_prometheus(record), encoding='utf-8')
+        os.replace(tmp, path)
+    else:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+    return path
+
+
+def print_summary(record, file=sys.stderr):
+    """Print where the run spent its time."""
+    print(f"⏱️ {record['script']} finished in {record['duration_seconds']:.2f}s ({record['status']})", file=file)
+    for name, values in sorted(record['stages'].items(), key=lambda item: -item[1]['seconds']):
+        print(f"   {name:<12} {values['seconds']:8.3f}s  {values['calls']:>6} calls", file=file)
+    if record['counters']:
+        print("   " + ", ".join(f"{name}={value}" for name, value in record['counters'].items()), file=file)
+
+
+@contextmanager
+def instrumented(script, args=None, metrics_file=None, profile=None):
+    """Run the body with fresh metrics and write them (and the profile) at the end.
+
+    Settings come from the parsed arguments of add_arguments(), or from the
+    metrics_file and profile keywords.
+    """
+    metrics_file = metrics_file or getattr(args, 'metrics_file', None)
+    profile = profile or getattr(args, 'profile', None)
+    reset()
+    profiler = cProfile.Profile() if profile else None
+    status = 'error'
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield
+        status = 'ok'
+    except SystemExit as e:
+        status = 'ok' if not e.code else 'error'
+        raise
+    finally:
+        if profiler:
+            profiler.disable()
+        record = build_record(script, time.perf_counter() - start, status)
+        if metrics_file or profile:
+            print_summary(record)
+        if metrics_file:
+            print(f"📈 Metrics written to {write_metrics(record, metrics_file)}", file=sys.stderr)
+        if profiler:
+            if profile == '-':
+                output = io.StringIO()
+                pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_TOP)
+                print(output.getvalue(), file=sys.stderr)
+            else:
+                profiler.dump_stats(profile)
+                print(f"🔬 Profile written to {profile} (view with: python -m pstats {profile})", file=sys.stderr)
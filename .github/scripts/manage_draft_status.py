@@ -4,19 +4,26 @@ Automatically manage draft status for blog posts based on publication dates.
 This script removes draft: true from posts when their publication date arrives.
 """
 
+import argparse
 import os
 import re
 import yaml
 from datetime import datetime, timezone
 from pathlib import Path
 
+import instrumentation
+from instrumentation import count, stage, timed
+
 # Configuration
 BLOG_POSTS_DIR = "docs/blog/posts"
 
+@timed("parse")
 def extract_front_matter(file_path):
     """Extract YAML front matter from a markdown file."""
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
+    count("files_read")
+    count("bytes_read", len(content.encode('utf-8')))
     
     # Match YAML front matter between --- markers
     match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
@@ -27,6 +34,7 @@ def extract_front_matter(file_path):
             return None
     return None
 
+@timed("write")
 def update_draft_status(file_path, front_matter):
     """Update the draft status in a markdown file."""
     with open(file_path, 'r', encoding='utf-8') as f:
@@ -40,6 +48,7 @@ def update_draft_status(file_path, front_matter):
         
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
+        count("files_written")
         return True
     return False
 
@@ -59,7 +68,10 @@ def main():
     
     published_count = 0
     
-    for md_file in blog_dir.rglob("*.md"):
+    with stage("scan"):
+        md_files = list(blog_dir.rglob("*.md"))
+    
+    for md_file in md_files:
         # Extract front matter
         front_matter = extract_front_matter(md_file)
         if not front_matter:
@@ -95,4 +107,8 @@ def main():
     print(f"📊 Summary: Published {published_count} posts today")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    with instrumentation.instrumented("manage_draft_status", args):
+        main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Post-build HTML optimiser for the generated site.
+Lazy-loads below-the-fold media, defers the consent widget until the visitor
+interacts, drops the wheel scripts from pages that have no wheel, and inlines
+the small local stylesheets. Pages are processed in parallel and the output of
+every input hash is cached, so unchanged pages are not processed again.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin
+
+# Configuration
+SITE_DIR = "site"
+CACHE_DIR = ".cache/html-optimizer"
+OPTIMIZER_VERSION = "1"
+
+# Images before this count inside the article are treated as above the fold
+EAGER_IMAGES = 1
+# Local stylesheets up to this size are inlined into every page
+INLINE_CSS_LIMIT = 8 * 1024
+
+# Scripts loaded on first interaction (or after a short idle delay)
+INTERACTION_SCRIPTS = (
+    "cookieconsent.min.js",
+    "js/cookieconsent-init.js",
+)
+# Stylesheets that are not needed for the first paint
+NON_CRITICAL_CSS = (
+    "cookieconsent.min.css",
+)
+# Resources only needed on pages with the Rat of Fortune wheel
+WHEEL_MARKER = 'id="wheelCanvas"'
+WHEEL_RESOURCES = (
+    "TweenMax.min.js",
+    "Winwheel.min.js",
+    "js/wheel.js",
+    "css/rat.css",
+)
+
+IMG_RE = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+IFRAME_RE = re.compile(r'<iframe\b[^>]*>', re.IGNORECASE)
+VIDEO_RE = re.compile(r'<video\b[^>]*>', re.IGNORECASE)
+# The look-behind keeps the data-deferred-src stubs written below from matching
+SCRIPT_RE = re.compile(r'<script\b[^>]*(?<![-\w])src="([^"]+)"[^>]*>\s*</script>', re.IGNORECASE)
+STYLESHEET_RE = re.compile(r'<link\b[^>]*\brel="stylesheet"[^>]*>', re.IGNORECASE)
+HREF_RE = re.compile(r'\bhref="([^"]+)"')
+ARTICLE_RE = re.compile(r'<article\b', re.IGNORECASE)
+
+DEFERRED_LOADER = """<script>
+(function () {
+  var loaded = false;
+  var events = ["pointerdown", "keydown", "scroll", "touchstart"];
+  function load() {
+    if (loaded) return;
+    loaded = true;
+    events.forEach(function (e) { removeEventListener(e, load, true); });
+    var queue = [].slice.call(document.querySelectorAll("script[data-deferred-src]"));
+    (function next() {
+      var stub = queue.shift();
+      if (!stub) return;
+      var s = document.createElement("script");
+      s.src = stub.getAttribute("data-deferred-src");
+      s.onload = s.onerror = next;
+      document.body.appendChild(s);
+    })();
+  }
+  events.forEach(function (e) { addEventListener(e, load, { capture: true, passive: true, once: true }); });
+  addEventListener("load", function () { setTimeout(load, 4000); });
+})();
+</script>"""
+
+
+def add_attribute(tag, name, value):
+    """Add name="value" to an HTML start tag unless the attribute is set."""
+    if re.search(rf'\s{name}=', tag, re.IGNORECASE):
+        return tag
+    end = -2 if tag.endswith('/>') else -1
+    return f'{tag[:end].rstrip()} {name}="{value}"{tag[end:]}'
+
+
+def lazy_load_media(html):
+    """Lazy-load images after the first EAGER_IMAGES article images, iframes and videos."""
+    article = ARTICLE_RE.search(html)
+    article_start = article.start() if article else 0
+    eager = 0
+
+    def image(match):
+        nonlocal eager
+        tag = add_attribute(match.group(0), 'decoding', 'async')
+        if match.start() >= article_start and eager < EAGER_IMAGES:
+            eager += 1
+            return tag
+        return add_attribute(tag, 'loading', 'lazy')
+
+    html = IMG_RE.sub(image, html)
+    html = IFRAME_RE.sub(lambda m: add_attribute(m.group(0), 'loading', 'lazy'), html)
+    html = VIDEO_RE.sub(lambda m: add_attribute(m.group(0), 'preload', 'none'), html)
+    return html
+
+
+def defer_scripts(html):
+    """Defer interaction scripts and drop wheel scripts on pages without a wheel."""
+    has_wheel = WHEEL_MARKER in html
+    deferred = False
+
+    def script(match):
+        nonlocal deferred
+        src = match.group(1)
+        if not has_wheel and src.endswith(WHEEL_RESOURCES):
+            return ''
+        if src.endswith(INTERACTION_SCRIPTS):
+            deferred = True
+            return f'<script type="text/plain" data-deferred-src="{src}"></script>'
+        return match.group(0)
+
+    html = SCRIPT_RE.sub(script, html)
+    if deferred and DEFERRED_LOADER not in html:
+        html = html.replace('</body>', DEFERRED_LOADER + '\n</body>', 1)
+    return html
+
+
+def optimize_stylesheets(html, page_path, site_dir):
+    """Inline small local stylesheets and load non-critical ones without blocking."""
+    has_wheel = WHEEL_MARKER in html
+    page_url = page_path.relative_to(site_dir).as_posix()
+
+    def stylesheet(match):
+        tag = match.group(0)
+        href = HREF_RE.search(tag)
+        if not href:
+            return tag
+        href = href.group(1)
+        if not has_wheel and href.endswith(WHEEL_RESOURCES):
+            return ''
+        if href.endswith(NON_CRITICAL_CSS):
+            # Already loaded without blocking by an earlier pass
+            if 'media="print"' in tag or match.string.endswith('<noscript>', 0, match.start()):
+                return tag
+            return (f'<link rel="stylesheet" href="{href}" media="print" onload="this.media=\'all\'">'
+                    f'<noscript>{tag}</noscript>')
+        if '://' in href or href.startswith('//') or '/assets/' in f'/{href}':
+            return tag
+        css_file = site_dir / urljoin(page_url, href)
+        if css_file.is_file() and css_file.stat().st_size <= INLINE_CSS_LIMIT:
+            css = css_file.read_text(encoding='utf-8')
+            if 'url(' not in css:
+                return f'<style>{css}</style>'
+        return tag
+
+    return STYLESHEET_RE.sub(stylesheet, html)
+
+
+def optimize_html(html, page_path, site_dir):
+    """Apply all optimisations to one page."""
+    html = lazy_load_media(html)
+    html = defer_scripts(html)
+    html = optimize_stylesheets(html, page_path, site_dir)
+    return html
+
+
+def cache_key(data, page_path, site_dir):
+    """Hash the page together with everything that influences its output."""
+    digest = hashlib.sha256(OPTIMIZER_VERSION.encode())
+    digest.update(page_path.relative_to(site_dir).as_posix().encode())
+    for css in sorted(Path(site_dir).glob('css/*.css')):
+        digest.update(css.read_bytes())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def process_page(page_path, site_dir, cache_dir):
+    """Optimise one page, reusing the cached output for an unchanged input."""
+    data = page_path.read_bytes()
+    key = cache_key(data, page_path, site_dir)
+    cached = cache_dir / f"{key}.html"
+    if cached.exists():
+        optimized = cached.read_bytes()
+        page_path.write_bytes(optimized)
+        # Keep the entry for the output too, so the next run over this site hits it
+        return 'cached', [key, cache_key(optimized, page_path, site_dir)]
+
+    html = data.decode('utf-8')
+    optimized = optimize_html(html, page_path, site_dir).encode('utf-8')
+    cached.write_bytes(optimized)
+    if optimized == data:
+        return 'unchanged', [key]
+    # Seeing our own output again (e.g. a second run) must be a cache hit too
+    output_key = cache_key(optimized, page_path, site_dir)
+    (cache_dir / f"{output_key}.html").write_bytes(optimized)
+    page_path.write_bytes(optimized)
+    return 'optimized', [key, output_key]
+
+
+def main():
+    """Optimise every HTML page of the built site."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--site-dir', default=SITE_DIR, help='Built MkDocs site directory')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Directory for cached page output')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Parallel worker processes')
+    args = parser.parse_args()
+
+    site_dir = Path(args.site_dir)
+    if not site_dir.is_dir():
+        print(f"❌ Site directory not found: {site_dir}")
+        return 1
+    cache_dir = Path(args.cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    pages = sorted(site_dir.rglob('*.html'))
+    print(f"⚡ Optimising {len(pages)} pages with {args.workers} workers...")
+
+    counts = {'optimized': 0, 'cached': 0, 'unchanged': 0}
+    used = set()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        results = pool.map(process_page, pages, [site_dir] * len(pages),
+                           [cache_dir] * len(pages), chunksize=16)
+        for result, keys in results:
+            counts[result] += 1
+            used.update(keys)
+
+    # Drop cache entries of pages that no longer exist in this form
+    for entry in cache_dir.glob('*.html'):
+        if entry.stem not in used:
+            entry.unlink()
+
+    print(f"📊 Summary: {counts['optimized']} optimised, {counts['cached']} from cache, "
+          f"{counts['unchanged']} unchanged")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
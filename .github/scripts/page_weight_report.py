@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Build-time page-weight and performance budget report.
+Walks the generated site, measures what each page costs to load, checks the
+numbers against the budgets in page_budgets.yml and against the previous
+build's report, and writes a JSON and a Markdown summary. With --overlay-of
+only the pages of a preview overlay are measured; their assets are looked up
+in the full build the overlay was taken from.
+"""
+
+import argparse
+import fnmatch
+import json
+import sys
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import yaml
+
+# Configuration
+SITE_DIR = "site"
+SITE_URL = "https://netdevops.it"
+BUDGETS_FILE = Path(__file__).parent / "page_budgets.yml"
+REPORT_JSON = "page-weight-report.json"
+REPORT_MARKDOWN = "page-weight-report.md"
+
+METRICS = ("html_bytes", "total_bytes", "third_party_requests", "largest_image_bytes")
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".avif", ".svg"}
+
+
+class AssetCollector(HTMLParser):
+    """Collect the URLs of everything a page loads."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.assets = []  # (kind, url)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script':
+            src = attrs.get('src') or attrs.get('data-deferred-src')
+            if src:
+                self.assets.append(('script', src))
+        elif tag == 'link':
+            rel = (attrs.get('rel') or '').lower().split()
+            if attrs.get('href') and ({'stylesheet', 'icon', 'preload', 'modulepreload'} & set(rel)):
+                self.assets.append(('style' if 'stylesheet' in rel else 'link', attrs['href']))
+        elif tag == 'img':
+            if attrs.get('src'):
+                self.assets.append(('image', attrs['src']))
+        elif tag in ('source', 'video', 'audio', 'iframe', 'embed'):
+            if attrs.get('src'):
+                self.assets.append(('media', attrs['src']))
+
+
+def resolve_asset(url, page_url, site_dir):
+    """Return (local_path, None) for site files or (None, host) for third-party URLs."""
+    if url.startswith(('data:', 'blob:', 'javascript:', '#')):
+        return None, None
+    absolute = urljoin(f"{SITE_URL}/{page_url}", url)
+    parts = urlsplit(absolute)
+    if f"{parts.scheme}://{parts.netloc}" != SITE_URL:
+        return None, parts.netloc
+    local = site_dir / parts.path.lstrip('/')
+    if parts.path.endswith('/'):
+        local = local / 'index.html'
+    return local, None
+
+
+def measure_page(page_path, site_dir, asset_dir=None):
+    """Measure a single page; assets missing from site_dir are looked up in asset_dir."""
+    page_url = page_path.relative_to(site_dir).as_posix()
+    html = page_path.read_text(encoding='utf-8', errors='replace')
+    collector = AssetCollector()
+    collector.feed(html)
+
+    seen = set()
+    asset_bytes = 0
+    third_party = set()
+    largest_image = {'url': None, 'bytes': 0}
+    missing = []
+
+    for kind, url in collector.assets:
+        local, host = resolve_asset(url, page_url, site_dir)
+        if host:
+            third_party.add(url)
+            continue
+        if local is None or local in seen:
+            continue
+        seen.add(local)
+        if not local.is_file() and asset_dir is not None:
+            local = asset_dir / local.relative_to(site_dir)
+        if not local.is_file():
+            missing.append(url)
+            continue
+        size = local.stat().st_size
+        asset_bytes += size
+        if kind in ('image', 'media') and local.suffix.lower() in IMAGE_SUFFIXES \
+                and size > largest_image['bytes']:
+            largest_image = {'url': url_of(local, site_dir, asset_dir), 'bytes': size}
+
+    html_bytes = page_path.stat().st_size
+    return {
+        'html_bytes': html_bytes,
+        'asset_bytes': asset_bytes,
+        'total_bytes': html_bytes + asset_bytes,
+        'requests': 1 + len(seen) + len(third_party),
+        'third_party_requests': len(third_party),
+        'third_party_hosts': sorted({urlsplit(urljoin(SITE_URL, u)).netloc for u in third_party}),
+        'largest_image': largest_image['url'],
+        'largest_image_bytes': largest_image['bytes'],
+        'missing_assets': missing,
+    }
+
+
+def url_of(local, site_dir, asset_dir=None):
+    """Return the site-relative path of a local file."""
+    root = asset_dir if asset_dir is not None and not local.is_relative_to(site_dir) else site_dir
+    return local.relative_to(root).as_posix()
+
+
+def load_budgets(path):
+    """Load the budget configuration."""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f) or {}
+    config.setdefault('defaults', {})
+    config.setdefault('pages', [])
+    config.setdefault('regression_threshold', 0.10)
+    return config
+
+
+def budgets_for(page, config):
+    """Return the effective budgets for a page."""
+    budgets = dict(config['defaults'])
+    for rule in config['pages']:
+        if fnmatch.fnmatch(page, rule.get('match', '')):
+            budgets.update({k: v for k, v in rule.items() if k != 'match'})
+    return budgets
+
+
+def check_page(page, metrics, config, previous):
+    """Return the budget violations and regressions for a page."""
+    violations = []
+    for metric, limit in budgets_for(page, config).items():
+        if metric in metrics and metrics[metric] > limit:
+            violations.append({'metric': metric, 'value': metrics[metric], 'budget': limit})
+
+    regressions = []
+    before = (previous or {}).get(page)
+    if before:
+        for metric in METRICS:
+            old, new = before.get(metric, 0), metrics[metric]
+            if new > old and (old == 0 or (new - old) / old > config['regression_threshold']):
+                regressions.append({'metric': metric, 'previous': old, 'value': new})
+    return violations, regressions
+
+
+def build_report(site_dir, config, previous=None, asset_dir=None):
+    """Measure every page and compare with budgets and the previous report.
+
+    With asset_dir, site_dir is a partial overlay: only its pages are
+    measured, and totals are compared with the same pages of the previous
+    report. Pages missing from an overlay are not reported as removed.
+    """
+    previous_pages = (previous or {}).get('pages', {})
+    pages = {}
+    for page_path in sorted(site_dir.rglob('*.html')):
+        page = page_path.relative_to(site_dir).as_posix()
+        metrics = measure_page(page_path, site_dir, asset_dir)
+        metrics['violations'], metrics['regressions'] = check_page(page, metrics, config, previous_pages)
+        pages[page] = metrics
+
+    summed = ('html_bytes', 'total_bytes')
+    totals = {metric: sum(p[metric] for p in pages.values()) for metric in summed}
+    previous_totals = (previous or {}).get('totals')
+    if previous and asset_dir is not None:
+        previous_totals = {metric: sum(previous_pages[page].get(metric, 0) for page in pages if page in previous_pages)
+                           for metric in summed}
+    return {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'partial': asset_dir is not None,
+        'pages': pages,
+        'totals': totals,
+        'previous_totals': previous_totals,
+        'added_pages': sorted(set(pages) - set(previous_pages)) if previous else [],
+        'removed_pages': sorted(set(previous_pages) - set(pages)) if previous and asset_dir is None else [],
+        'over_budget': sorted(p for p, m in pages.items() if m['violations']),
+        'regressed': sorted(p for p, m in pages.items() if m['regressions']),
+    }
+
+
+def human(value, metric):
+    """Format a metric value for the Markdown report."""
+    return f"{value:,}" if metric.endswith('requests') else f"{value / 1024:,.1f} KiB"
+
+
+def render_markdown(report, top=10):
+    """Render the report as Markdown for PR comments and job summaries."""
+    pages = report['pages']
+    lines = ["## 📦 Page-weight report", ""]
+    if report.get('partial'):
+        lines += ["Changed pages only (preview overlay build).", ""]
+    totals, before = report['totals'], report.get('previous_totals')
+    for metric, value in totals.items():
+        delta = ""
+        if before and before.get(metric):
+            change = (value - before[metric]) / before[metric]
+            delta = f" ({change:+.1%} vs previous build)"
+        lines.append(f"- **{metric.replace('_', ' ')}** across {len(pages)} pages: {human(value, metric)}{delta}")
+    if report['added_pages'] or report['removed_pages']:
+        lines.append(f"- **pages added / removed**: {len(report['added_pages'])} / {len(report['removed_pages'])}")
+    lines.append("")
+
+    if report['over_budget']:
+        lines += ["### ❌ Over budget", "", "| Page | Metric | Value | Budget |", "|---|---|---|---|"]
+        for page in report['over_budget']:
+            for v in pages[page]['violations']:
+                lines.append(f"| `{page}` | {v['metric']} | {human(v['value'], v['metric'])} | "
+                             f"{human(v['budget'], v['metric'])} |")
+        lines.append("")
+    else:
+        lines += ["✅ All pages are within budget.", ""]
+
+    if report['regressed']:
+        lines += ["### ⚠️ Regressions", "", "| Page | Metric | Previous | Now |", "|---|---|---|---|"]
+        for page in report['regressed']:
+            for r in pages[page]['regressions']:
+                lines.append(f"| `{page}` | {r['metric']} | {human(r['previous'], r['metric'])} | "
+                             f"{human(r['value'], r['metric'])} |")
+        lines.append("")
+
+    heaviest = sorted(pages.items(), key=lambda item: item[1]['total_bytes'], reverse=True)[:top]
+    lines += [f"### Heaviest {len(heaviest)} pages", "",
+              "| Page | HTML | Total | 3rd-party req. | Largest image |", "|---|---|---|---|---|"]
+    for page, m in heaviest:
+        image = f"`{m['largest_image']}` ({human(m['largest_image_bytes'], 'bytes')})" if m['largest_image'] else "–"
+        lines.append(f"| `{page}` | {human(m['html_bytes'], 'bytes')} | {human(m['total_bytes'], 'bytes')} | "
+                     f"{m['third_party_requests']} | {image} |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    """Generate the page-weight report for a built site."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--site-dir', default=SITE_DIR, help='Built MkDocs site directory')
+    parser.add_argument('--budgets', default=BUDGETS_FILE, help='Budget configuration (YAML)')
+    parser.add_argument('--previous', help="Previous build's JSON report to compare against")
+    parser.add_argument('--overlay-of', metavar='DIR',
+                        help='site-dir is a preview overlay of this full build; measure only its pages')
+    parser.add_argument('--output-json', default=REPORT_JSON, help='Where to write the JSON report')
+    parser.add_argument('--output-markdown', default=REPORT_MARKDOWN, help='Where to write the Markdown summary')
+    parser.add_argument('--fail-on-budget', action='store_true', help='Exit non-zero when a page is over budget')
+    args = parser.parse_args()
+
+    site_dir = Path(args.site_dir)
+    if not site_dir.is_dir():
+        print(f"❌ Site directory not found: {site_dir}")
+        return 1
+
+    previous = None
+    if args.previous and Path(args.previous).exists():
+        with open(args.previous, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        print(f"📄 Comparing with previous report: {args.previous}")
+    elif args.previous:
+        print(f"⚠️ Previous report not found: {args.previous}")
+
+    print(f"📏 Measuring pages in {site_dir}...")
+    asset_dir = Path(args.overlay_of) if args.overlay_of else None
+    report = build_report(site_dir, load_budgets(args.budgets), previous, asset_dir)
+
+    with open(args.output_json, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    Path(args.output_markdown).write_text(render_markdown(report), encoding='utf-8')
+
+    print(f"📊 Summary: {len(report['pages'])} pages, {len(report['over_budget'])} over budget, "
+          f"{len(report['regressed'])} regressed")
+    print(f"✅ Wrote {args.output_json} and {args.output_markdown}")
+
+    if args.fail_on_budget and report['over_budget']:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
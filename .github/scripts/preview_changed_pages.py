@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Changed-pages-only preview builds.
+
+"plan" works out from the changed files of a PR or push which pages need to
+be rebuilt, or whether a full build is required (config, theme, nav or
+removed pages). "build" renders only those pages plus their blog index, tag
+and RSS dependents: every other Markdown file is replaced by a stub that only
+keeps its front matter and title, so navigation and tags stay complete while
+rendering takes seconds. The resulting files are collected into an overlay
+directory that is deployed on top of the last full preview build, so an
+overlay is only planned when that build is still on the pages branch.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from fnmatch import fnmatch
+from pathlib import Path
+
+import yaml
+
+# Configuration
+DOCS_DIR = "docs"
+CONFIG_FILE = "mkdocs.yml"
+WORK_DIR = ".cache/preview"
+PLAN_FILE = "preview-plan.json"
+MANIFEST_FILE = "page-manifest.json"
+BLOG_DIR = "blog"
+BLOG_POSTS_DIR = "blog/posts"
+TAGS_PAGE = "tags.md"
+PAGES_BRANCH = "origin/gh-pages"
+
+# Changes to any of these require a full build
+FULL_BUILD_PATTERNS = (
+    "mkdocs.yml",
+    "requirements.txt",
+    "hooks/*",
+    "overrides/*",
+    "docs/css/*",
+    "docs/js/*",
+    "docs/blog/.authors.yml",
+    "docs/blog/.meta.yml",
+    ".github/scripts/build_search_shards.py",
+    ".github/scripts/optimize_html.py",
+)
+# Plugins that are slow and not needed to preview content
+PREVIEW_DISABLED_PLUGINS = ("git-revision-date-localized",)
+FEED_FILES = ("feed_rss_created.xml", "feed_rss_updated.xml", "feed_json_created.json", "feed_json_updated.json")
+
+
+def extract_front_matter(file_path):
+    """Extract YAML front matter from a markdown file."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    # Match YAML front matter between --- markers
+    match = re.match(r'^---\s*\n(.*?)\n---\s*\n', content, re.DOTALL)
+    if match:
+        try:
+            return yaml.safe_load(match.group(1))
+        except yaml.YAMLError:
+            return None
+    return None
+
+
+def git_changes(base, head="HEAD", merge_base=True):
+    """Return (status, path) tuples for the files changed between base and head.
+
+    With merge_base the diff starts at the common ancestor (the changes of a
+    branch); without it, it is the plain difference of the two commits.
+    """
+    result = subprocess.run(
+        ["git", "diff", "--name-status", "--no-renames", f"{base}{'...' if merge_base else '..'}{head}"],
+        capture_output=True, text=True, check=True,
+    )
+    changes = []
+    for line in result.stdout.splitlines():
+        status, _, path = line.partition("\t")
+        changes.append((status[0], path))
+    return changes
+
+
+def merge_changes(*change_lists):
+    """Combine change lists into one entry per path; a deletion in any list wins."""
+    merged = {}
+    for changes in change_lists:
+        for status, path in changes:
+            if merged.get(path) != 'D':
+                merged[path] = status
+    return [(status, path) for path, status in sorted(merged.items())]
+
+
+def preview_exists(pages_branch, preview_dir):
+    """Return True if a full preview build of preview_dir is on the pages branch."""
+    result = subprocess.run(["git", "cat-file", "-e", f"{pages_branch}:{preview_dir}/{MANIFEST_FILE}"],
+                            capture_output=True)
+    return result.returncode == 0
+
+
+def has_tags(path):
+    """Return True if a docs file exists and declares tags."""
+    if not Path(path).exists():
+        return False
+    front_matter = extract_front_matter(path) or {}
+    return bool(front_matter.get('tags'))
+
+
+def make_plan(changes, full_reason=None, docs_dir=DOCS_DIR):
+    """Decide between a full build and an overlay of the affected pages.
+
+    changes are repository paths; docs_dir is where the docs are on disk.
+    """
+    plan = {'mode': 'overlay', 'reason': None, 'pages': [], 'static': [], 'blog': False, 'tags': False}
+    if full_reason:
+        plan.update(mode='full', reason=full_reason)
+        return plan
+
+    for status, path in changes:
+        if any(fnmatch(path, pattern) for pattern in FULL_BUILD_PATTERNS):
+            plan.update(mode='full', reason=f"{path} changed")
+            return plan
+        if not path.startswith(f"{DOCS_DIR}/"):
+            continue  # not part of the site
+        src = path[len(DOCS_DIR) + 1:]
+        if status == 'D':
+            plan.update(mode='full', reason=f"{path} was removed")
+            return plan
+        if not src.endswith('.md'):
+            plan['static'].append(src)
+            continue
+        plan['pages'].append(src)
+        if src.startswith(f"{BLOG_POSTS_DIR}/"):
+            plan['blog'] = True
+        if has_tags(Path(docs_dir, src)):
+            plan['tags'] = True
+
+    if not plan['pages'] and not plan['static']:
+        plan.update(mode='skip', reason="no site content changed")
+    return plan
+
+
+def stub_markdown(path):
+    """Reduce a page to its front matter and first heading."""
+    content = Path(path).read_text(encoding='utf-8')
+    front_matter = ''
+    body = content
+    match = re.match(r'^---\s*\n.*?\n---\s*\n', content, re.DOTALL)
+    if match:
+        front_matter, body = match.group(0), content[match.end():]
+    heading = re.search(r'^#\s+.+$', body, re.MULTILINE)
+    return front_matter + (heading.group(0) + "\n" if heading else "")
+
+
+def link_or_copy(src, dest):
+    """Hard-link a file into the staging tree, falling back to a copy."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+
+def rebuild_set(plan, docs_dir=DOCS_DIR):
+    """Return the docs pages that must be rendered in full."""
+    pages = set(plan['pages'])
+    if plan['blog']:
+        # Listings show excerpts, reading time and "continue reading" links,
+        # which all depend on the full text of every post
+        pages.add(f"{BLOG_DIR}/index.md")
+        pages.update(path.relative_to(docs_dir).as_posix()
+                     for path in Path(docs_dir, BLOG_POSTS_DIR).rglob('*.md'))
+    if plan['tags']:
+        pages.add(TAGS_PAGE)
+    return pages
+
+
+def stage_docs(plan, staging_dir):
+    """Create a docs tree with full changed pages and stubs for everything else."""
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    rebuild = rebuild_set(plan)
+    docs_dir = Path(DOCS_DIR)
+    stubs = 0
+    for path in docs_dir.rglob('*'):
+        if not path.is_file():
+            continue
+        src = path.relative_to(docs_dir).as_posix()
+        dest = staging_dir / src
+        if path.suffix != '.md' or src in rebuild:
+            link_or_copy(path, dest)
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        dest.write_text(stub_markdown(path), encoding='utf-8')
+        stubs += 1
+    return stubs
+
+
+def write_preview_config(staging_dir, build_dir, config_path):
+    """Write an mkdocs config that builds the staged docs without slow plugins."""
+    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    plugins = []
+    for plugin in config.get('plugins', []):
+        name = plugin if isinstance(plugin, str) else next(iter(plugin))
+        if name in PREVIEW_DISABLED_PLUGINS:
+            continue
+        if name == 'rss':
+            plugin = {'rss': {**(plugin.get('rss') or {}), 'use_git': False}}
+        plugins.append(plugin)
+
+    config['plugins'] = plugins
+    config['docs_dir'] = str(staging_dir.resolve())
+    config['site_dir'] = str(build_dir.resolve())
+    config['hooks'] = [str(Path(hook).resolve()) for hook in config.get('hooks', [])]
+    config_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(config_path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, sort_keys=False, allow_unicode=True)
+
+
+def collect_overlay(plan, build_dir, overlay_dir):
+    """Copy the rebuilt pages and their dependents into the overlay directory."""
+    with open(build_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    changed = set(plan['pages'])
+    outputs = set(plan['static'])
+    for page in manifest['pages']:
+        src = page['src']
+        if src in changed:
+            outputs.add(page['dest'])
+        elif plan['blog'] and page['generated'] and src.startswith(f"{BLOG_DIR}/"):
+            outputs.add(page['dest'])  # index, archive, category and pagination views
+        elif plan['blog'] and src == f"{BLOG_DIR}/index.md":
+            outputs.add(page['dest'])
+        elif plan['tags'] and src == TAGS_PAGE:
+            outputs.add(page['dest'])
+    if plan['blog']:
+        outputs.update(feed for feed in FEED_FILES if (build_dir / feed).exists())
+
+    if overlay_dir.exists():
+        shutil.rmtree(overlay_dir)
+    for output in sorted(outputs):
+        link_or_copy(build_dir / output, overlay_dir / output)
+    return sorted(outputs)
+
+
+def write_github_output(**values):
+    """Expose values as step outputs when running in GitHub Actions."""
+    output = os.environ.get('GITHUB_OUTPUT')
+    if output:
+        with open(output, 'a', encoding='utf-8') as f:
+            for key, value in values.items():
+                f.write(f"{key}={value}\n")
+
+
+def cmd_plan(args):
+    """Write the preview plan for the changes since --base."""
+    full_reason = None
+    if args.full:
+        full_reason = "full build requested"
+    elif args.event_action in ('opened', 'reopened'):
+        full_reason = f"pull request {args.event_action}, no previous preview to overlay"
+
+    changes = []
+    if not full_reason:
+        try:
+            changes = git_changes(args.base)
+            if args.since:
+                # Files changed since the previous preview must be rebuilt too,
+                # even when they now match the base again (a reverted change)
+                changes = merge_changes(changes, git_changes(args.since, merge_base=False))
+        except subprocess.CalledProcessError:
+            full_reason = f"cannot diff against {args.since or args.base!r}"
+    plan = make_plan(changes, full_reason)
+    # Full builds of other previews and main deploys may have replaced the
+    # pages branch; an overlay without its base would publish only a few pages
+    if plan['mode'] == 'overlay' and args.preview_dir and not preview_exists(args.pages_branch, args.preview_dir):
+        plan = make_plan([], f"no previous preview at {args.pages_branch}:{args.preview_dir} to overlay")
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+
+    if plan['mode'] == 'full':
+        print(f"🏗️ Full build: {plan['reason']}")
+    elif plan['mode'] == 'skip':
+        print(f"⏭️ Nothing to build: {plan['reason']}")
+    else:
+        print(f"🧩 Overlay build: {len(plan['pages'])} pages, {len(plan['static'])} static files "
+              f"(blog dependents: {plan['blog']}, tags: {plan['tags']})")
+        for page in plan['pages']:
+            print(f"  📄 {page}")
+    write_github_output(mode=plan['mode'])
+    return 0
+
+
+def cmd_build(args):
+    """Render the planned pages and collect the overlay."""
+    with open(args.plan, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan['mode'] == 'skip':
+        print(f"⏭️ Nothing to build: {plan['reason']}")
+        return 0
+    if plan['mode'] != 'overlay':
+        print("❌ Plan requires a full build, run mkdocs build instead")
+        return 1
+
+    start = time.perf_counter()
+    work_dir = Path(args.work_dir)
+    staging_dir, build_dir = work_dir / 'docs', work_dir / 'site'
+    config_path = work_dir / 'mkdocs.yml'
+
+    stubs = stage_docs(plan, staging_dir)
+    print(f"📝 Staged docs with {len(rebuild_set(plan))} full pages and {stubs} stubs")
+    write_preview_config(staging_dir, build_dir, config_path)
+
+    result = subprocess.run(["mkdocs", "build", "--quiet", "--clean", "--config-file", str(config_path)])
+    if result.returncode != 0:
+        print("❌ Preview build failed")
+        return result.returncode
+
+    outputs = collect_overlay(plan, build_dir, Path(args.output))
+    print(f"📦 Overlay contains {len(outputs)} files")
+    for output in outputs:
+        print(f"  ➕ {output}")
+    print(f"✅ Preview overlay built in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def main():
+    """Plan or build a changed-pages-only preview."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plan_parser = subparsers.add_parser('plan', help='Work out which pages a change affects')
+    plan_parser.add_argument('--base', default='origin/main', help='Git ref to diff against')
+    plan_parser.add_argument('--since', help='Commit of the previous preview; files changed since then are rebuilt')
+    plan_parser.add_argument('--event-action', default='', help='pull_request action (opened forces a full build)')
+    plan_parser.add_argument('--full', action='store_true', help='Force a full build')
+    plan_parser.add_argument('--preview-dir', help='Directory of this preview on the pages branch; '
+                             'an overlay is only planned when a full build is there')
+    plan_parser.add_argument('--pages-branch', default=PAGES_BRANCH, help='Git ref of the deployed pages')
+    plan_parser.add_argument('--output', default=PLAN_FILE, help='Where to write the plan')
+    plan_parser.set_defaults(func=cmd_plan)
+
+    build_parser = subparsers.add_parser('build', help='Build the overlay for a plan')
+    build_parser.add_argument('--plan', default=PLAN_FILE, help='Plan written by the plan command')
+    build_parser.add_argument('--work-dir', default=WORK_DIR, help='Scratch directory for staging and building')
+    build_parser.add_argument('--output', default='site', help='Directory that receives the overlay files')
+    build_parser.set_defaults(func=cmd_build)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Reconcile posted_to_bluesky.json with what is actually on the Bluesky feed.
+Pages through the account's author feed (getAuthorFeed) with cursors, matches
+feed posts to blog posts by the blog URL they link to, and adds, repairs or
+(with --rebuild) rebuilds the Bluesky entries of the posted log in bulk.
+Fetched feed items and the history cursor are cached, so later runs only
+fetch what was posted since the previous run; --rebuild discards the cache
+and reads the whole feed again, so deleted posts drop out as well.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from atproto import Client
+
+from announce_targets import LEGACY_TARGET, posted_targets
+from bluesky_auto_post import SITE_URL, load_archive_posts, load_posted_log, save_posted_log
+import instrumentation
+from instrumentation import count, stage
+
+# Configuration
+FEED_CACHE_FILE = ".cache/bluesky/author_feed.json"
+FEED_CACHE_VERSION = 1
+PUBLIC_SERVICE = "https://public.api.bsky.app/xrpc"
+PAGE_LIMIT = 100
+
+URL_RE = re.compile(r'https?://[^\s<>"\')\]]+')
+
+
+def normalize_url(url):
+    """Reduce a URL to host and path so http/https, case and trailing slashes do not matter."""
+    parts = urlsplit(url.strip().rstrip('.,;'))
+    return f"{parts.netloc.lower()}{parts.path.rstrip('/').lower()}"
+
+
+def load_feed_cache(path=FEED_CACHE_FILE, actor=None, refresh=False):
+    """Load the cached feed items; a cache for another account, or any cache with refresh, is discarded."""
+    cache_file = Path(path)
+    if cache_file.exists() and not refresh:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == FEED_CACHE_VERSION and cache.get('actor') == actor:
+            return cache
+    return {'version': FEED_CACHE_VERSION, 'actor': actor, 'cursor': None, 'complete': False, 'items': {}}
+
+
+def save_feed_cache(cache, path=FEED_CACHE_FILE):
+    """Save the feed cache."""
+    cache_file = Path(path)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def feed_item(post):
+    """Reduce a feed post view to its URI, creation time and linked URLs."""
+    record = post.record
+    urls = set(URL_RE.findall(getattr(record, 'text', '') or ''))
+    for facet in getattr(record, 'facets', None) or []:
+        urls.update(feature.uri for feature in facet.features if getattr(feature, 'uri', None))
+    external = getattr(getattr(record, 'embed', None), 'external', None)
+    if external is not None:
+        urls.add(external.uri)
+    return {'uri': post.uri, 'created_at': getattr(record, 'created_at', None) or post.indexed_at,
+            'urls': sorted(urls)}
+
+
+def author_feed_fetcher(client, actor, limit=PAGE_LIMIT):
+    """Return fetch_page(cursor) -> (items, next_cursor) for an account's own posts."""
+    def fetch_page(cursor):
+        params = {'actor': actor, 'limit': limit, 'filter': 'posts_no_replies'}
+        if cursor:
+            params['cursor'] = cursor
+        with stage("http_fetch"):
+            count("http_calls")
+            response = client.app.bsky.feed.get_author_feed(params=params)
+        # Reposts show other people's posts, skip them
+        items = [feed_item(view.post) for view in response.feed if view.reason is None]
+        return items, response.cursor
+    return fetch_page
+
+
+def sync_feed(fetch_page, cache, max_pages=None):
+    """Bring the cached feed up to date and return (new_items, pages_fetched).
+
+    The feed is newest first. New posts are fetched from the top until an
+    already cached post shows up. The full history is fetched once; its
+    cursor is kept in the cache so an interrupted or --max-pages limited
+    history scan resumes where it stopped on the next run.
+    """
+    items = cache['items']
+    first_run = not items and not cache['complete']
+    added = pages = 0
+
+    def store(page):
+        nonlocal added
+        fresh = [item for item in page if item['uri'] not in items]
+        count("cache_hits", len(page) - len(fresh))
+        for item in fresh:
+            items[item['uri']] = item
+        added += len(fresh)
+        return len(fresh) == len(page)
+
+    # New posts since the previous run (on the first run this is the history scan)
+    cursor = None
+    while True:
+        page, cursor = fetch_page(cursor)
+        pages += 1
+        all_new = store(page)
+        if first_run:
+            cache['cursor'], cache['complete'] = cursor, cursor is None
+            if max_pages is not None and pages >= max_pages:
+                return added, pages
+        if not cursor or not all_new:
+            break
+
+    # Continue the history scan where a previous run stopped
+    while not cache['complete'] and cache['cursor']:
+        if max_pages is not None and pages >= max_pages:
+            break
+        page, cursor = fetch_page(cache['cursor'])
+        pages += 1
+        store(page)
+        cache['cursor'], cache['complete'] = cursor, cursor is None
+    return added, pages
+
+
+def build_url_index(posts, posted_log):
+    """Map normalised blog URLs (current and previously logged) to post ids."""
+    index = {}
+    for post_id, entry in posted_log.items():
+        if entry.get('url'):
+            index[normalize_url(entry['url'])] = post_id
+    for post in posts:
+        index[normalize_url(post['url'])] = post['post_id']
+    return index
+
+
+def match_feed(items, url_index):
+    """Return {post_id: earliest feed item} for feed posts that link to a blog post."""
+    site = normalize_url(SITE_URL)
+    matches, unmatched = {}, []
+    for item in sorted(items, key=lambda item: item['created_at'] or ''):
+        post_ids = {url_index.get(normalize_url(url)) for url in item['urls']} - {None}
+        if not post_ids:
+            if any(normalize_url(url).startswith(site) for url in item['urls']):
+                unmatched.append(item)
+            continue
+        for post_id in post_ids:
+            matches.setdefault(post_id, item)
+    return matches, unmatched
+
+
+def reconcile(posted_log, posts, matches, rebuild=False, history_complete=True):
+    """Repair the Bluesky entries of the posted log from the feed matches.
+
+    Returns a summary of the changes. Entries that claim a Bluesky post the
+    feed does not have are only reported once the whole feed history has been
+    fetched, and only removed with rebuild.
+    """
+    posts_by_id = {post['post_id']: post for post in posts}
+    summary = {'added': [], 'repaired': [], 'missing_in_feed': [], 'removed': []}
+
+    for post_id, item in sorted(matches.items()):
+        entry = posted_log.get(post_id)
+        post = posts_by_id.get(post_id, {})
+        target = {'posted_at': item['created_at'], 'uri': item['uri']}
+        if entry is None:
+            posted_log[post_id] = {
+                'posted_at': item['created_at'],
+                'title': post.get('title', 'Untitled'),
+                'url': post.get('url') or item['urls'][0],
+                'targets': {LEGACY_TARGET: target},
+            }
+            summary['added'].append(post_id)
+            continue
+        if 'targets' not in entry:
+            entry['targets'] = {LEGACY_TARGET: {'posted_at': entry['posted_at']}} if entry.get('posted_at') else {}
+        current = entry['targets'].get(LEGACY_TARGET) or {}
+        if current.get('uri') != item['uri'] or (post.get('url') and entry.get('url') != post['url']):
+            entry['targets'][LEGACY_TARGET] = target
+            if post.get('url'):
+                entry['url'] = post['url']
+            entry.setdefault('posted_at', item['created_at'])
+            summary['repaired'].append(post_id)
+
+    if not history_complete:
+        return summary  # older posts may simply not be fetched yet
+    for post_id, entry in list(posted_log.items()):
+        if post_id in matches or LEGACY_TARGET not in posted_targets(entry):
+            continue
+        summary['missing_in_feed'].append(post_id)
+        if rebuild:
+            entry.get('targets', {}).pop(LEGACY_TARGET, None)
+            if not entry.get('targets'):
+                del posted_log[post_id]
+            summary['removed'].append(post_id)
+    return summary
+
+
+def main():
+    """Reconcile the posted log with the author feed."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--actor', default=os.environ.get('BLUESKY_IDENTIFIER'),
+                        help='Handle or DID whose feed is read (default: $BLUESKY_IDENTIFIER)')
+    parser.add_argument('--service', default=os.environ.get('BLUESKY_APPVIEW', PUBLIC_SERVICE),
+                        help='XRPC endpoint serving app.bsky.feed.getAuthorFeed')
+    parser.add_argument('--cache', default=FEED_CACHE_FILE, help='Feed cache file')
+    parser.add_argument('--max-pages', type=int, help='Fetch at most this many pages of history per run')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Refetch the whole feed and drop Bluesky entries that are not on it')
+    parser.add_argument('--write', action='store_true', help='Save the repaired posted log')
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    with instrumentation.instrumented("reconcile_posted_log", args):
+        return reconcile_command(args)
+
+
+def reconcile_command(args):
+    """Run the reconciliation for parsed command-line arguments."""
+
+    if not args.actor:
+        print("❌ No account given, use --actor or set BLUESKY_IDENTIFIER")
+        return 1
+    actor = args.actor.lstrip('@')
+
+    cache = load_feed_cache(args.cache, actor, refresh=args.rebuild)
+    print(f"📥 Reading the author feed of {actor} ({len(cache['items'])} posts cached)...")
+    fetch_page = author_feed_fetcher(Client(base_url=args.service), actor)
+    try:
+        added, pages = sync_feed(fetch_page, cache, args.max_pages)
+    finally:
+        cache['synced_at'] = datetime.now(timezone.utc).isoformat()
+        save_feed_cache(cache, args.cache)
+    history = "complete" if cache['complete'] else "incomplete, continues next run"
+    print(f"📄 Fetched {pages} pages, {added} new posts; {len(cache['items'])} cached (history {history})")
+
+    posted_log = load_posted_log()
+    posts = load_archive_posts()
+    matches, unmatched = match_feed(cache['items'].values(), build_url_index(posts, posted_log))
+    summary = reconcile(posted_log, posts, matches, args.rebuild, cache['complete'])
+
+    print(f"🔗 {len(matches)} blog posts found on the feed")
+    for key, label in (('added', '➕ Added'), ('repaired', '🔧 Repaired'),
+                       ('missing_in_feed', '❓ Logged but not on the feed'), ('removed', '🗑️ Removed')):
+        for post_id in summary[key]:
+            print(f"  {label}: {post_id}")
+    for item in unmatched:
+        print(f"  ⚠️ Feed post links to an unknown blog URL: {item['uri']} {item['urls']}")
+    if not cache['complete']:
+        print("⚠️ Feed history is incomplete, entries missing from the feed are not checked yet")
+
+    changed = summary['added'] or summary['repaired'] or summary['removed']
+    if changed and args.write:
+        save_posted_log(posted_log)
+        print("✅ Saved the reconciled posted log")
+    elif changed:
+        print("ℹ️ Dry run, use --write to save the reconciled posted log")
+    else:
+        print("✅ Posted log matches the feed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Redirects for pages whose URL changed between builds.
+A changed post title changes the slug the blog plugin derives, so links that
+were already shared (on Bluesky, in the posted log, by readers) break. This
+post-build step compares page-manifest.json of the previous deployment with
+the one just built, matches moved pages by source file or, for renamed files,
+by content hash, and writes a stub HTML redirect at every old URL. Redirects
+of earlier builds are carried forward (and re-pointed when a page moves
+again), and the new manifest and redirect map are kept for the next build.
+"""
+
+import argparse
+import html
+import json
+import shutil
+import sys
+from pathlib import Path
+from urllib.parse import urljoin
+
+# Configuration
+SITE_DIR = "site"
+STATE_DIR = ".cache/redirects"
+MANIFEST_FILE = "page-manifest.json"
+REDIRECTS_FILE = "redirects.json"
+REDIRECTS_VERSION = 1
+
+STUB_TEMPLATE = """<!doctype html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Redirecting...</title>
+<link rel="canonical" href="{href}">
+<meta name="robots" content="noindex">
+<meta http-equiv="refresh" content="0; url={href}">
+<script>location.replace({target} + location.search + location.hash)</script>
+</head>
+<body>
+<p>This page has moved to <a href="{href}">{href}</a>.</p>
+</body>
+</html>
+"""
+
+
+def load_manifest(path):
+    """Load a page manifest, or None if there is none."""
+    manifest_file = Path(path)
+    if not manifest_file.exists():
+        return None
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_redirects(path):
+    """Load the redirect map {old_url: new_url} of earlier builds."""
+    redirects_file = Path(path)
+    if redirects_file.exists():
+        with open(redirects_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == REDIRECTS_VERSION:
+            return data['redirects']
+    return {}
+
+
+def find_moves(previous_pages, pages):
+    """Return {old_url: new_url} for pages of the previous build that moved.
+
+    A page that disappeared from its URL is matched first by its source file,
+    then by the hash of its rendered content. Hash matches only count when
+    exactly one new page has that hash and that page did not exist before.
+    Generated pages (blog indexes, archives, tag pages) are never matched.
+    """
+    urls = {page['url'] for page in pages}
+    previous_urls = {page['url'] for page in previous_pages}
+    by_src = {page['src']: page['url'] for page in pages if not page.get('generated')}
+    by_hash = {}
+    for page in pages:
+        if page['url'] not in previous_urls and not page.get('generated'):
+            by_hash[page['hash']] = None if page['hash'] in by_hash else page['url']
+
+    moves = {}
+    for page in previous_pages:
+        if page['url'] in urls or page.get('generated'):
+            continue
+        target = by_src.get(page['src']) or by_hash.get(page['hash'])
+        if target and target != page['url']:
+            moves[page['url']] = target
+    return moves
+
+
+def update_redirects(redirects, moves, urls):
+    """Merge this build's moves into the redirect map and return the dropped entries.
+
+    Older redirects pointing at a page that moved now are re-pointed, so no
+    chain is longer than one hop. Redirects from a URL that is a real page
+    again, or to a page that no longer exists, are dropped.
+    """
+    dropped = []
+    for old_url, target in list(redirects.items()):
+        target = moves.get(target, target)
+        if old_url in urls or target not in urls:
+            del redirects[old_url]
+            dropped.append(old_url)
+        else:
+            redirects[old_url] = target
+    redirects.update(moves)
+    return dropped
+
+
+def stub_path(site_dir, url):
+    """Return the file that serves url in the built site."""
+    path = url.lstrip('/')
+    if not path or path.endswith('/'):
+        path += 'index.html'
+    return Path(site_dir) / path
+
+
+def write_stubs(site_dir, redirects, site_url=None):
+    """Write a redirect stub for every old URL that has no file of its own."""
+    written = skipped = 0
+    base = site_url or '/'
+    for old_url, target in sorted(redirects.items()):
+        path = stub_path(site_dir, old_url)
+        if path.exists():
+            skipped += 1  # never overwrite real output
+            continue
+        href = urljoin(base, target)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(STUB_TEMPLATE.format(href=html.escape(href), target=json.dumps(href).replace('</', '<\\/')),
+                        encoding='utf-8')
+        written += 1
+    return written, skipped
+
+
+def save_redirects(redirects, path):
+    """Save the redirect map."""
+    redirects_file = Path(path)
+    redirects_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(redirects_file, 'w', encoding='utf-8') as f:
+        json.dump({'version': REDIRECTS_VERSION, 'redirects': dict(sorted(redirects.items()))}, f, indent=1)
+
+
+def main():
+    """Generate the redirects of the built site."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--site-dir', default=SITE_DIR, help='Built MkDocs site directory')
+    parser.add_argument('--state-dir', default=STATE_DIR,
+                        help='Directory holding the manifest and redirect map of the previous deployment')
+    args = parser.parse_args()
+
+    site_dir, state_dir = Path(args.site_dir), Path(args.state_dir)
+    manifest = load_manifest(site_dir / MANIFEST_FILE)
+    if manifest is None:
+        print(f"❌ No {MANIFEST_FILE} in {site_dir}, is the page_manifest hook enabled?")
+        return 1
+
+    previous = load_manifest(state_dir / MANIFEST_FILE)
+    redirects = load_redirects(state_dir / REDIRECTS_FILE)
+    pages = manifest['pages']
+    if previous is None:
+        print("ℹ️ No previous manifest, only carrying existing redirects forward")
+        moves = {}
+    else:
+        moves = find_moves(previous['pages'], pages)
+    dropped = update_redirects(redirects, moves, {page['url'] for page in pages})
+
+    for old_url, target in sorted(moves.items()):
+        print(f"  ↪️ /{old_url.lstrip('/')} -> /{target.lstrip('/')}")
+    for old_url in dropped:
+        print(f"  🗑️ Dropped redirect from /{old_url.lstrip('/')}")
+    written, skipped = write_stubs(site_dir, redirects, manifest.get('site_url'))
+    if skipped:
+        print(f"⚠️ {skipped} redirects skipped because a file already exists at the old URL")
+
+    # The site carries the map, the state directory seeds the next build
+    save_redirects(redirects, site_dir / REDIRECTS_FILE)
+    save_redirects(redirects, state_dir / REDIRECTS_FILE)
+    shutil.copyfile(site_dir / MANIFEST_FILE, state_dir / MANIFEST_FILE)
+    print(f"📊 {len(moves)} pages moved, {len(redirects)} redirects, {written} stubs written")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test script for the throttled backfill queue.
+"""
+
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from announce_queue import DEFAULTS, is_immediate, load_queue, priority, release_due, save_queue, sync_queue
+
+TODAY = date(2025, 11, 10)
+CONFIG = {**DEFAULTS, 'rate': 2, 'interval_hours': 24, 'tag_weights': {'nautobot': 3}}
+
+
+def post(post_id, days_old, tags=(), **front_matter):
+    """A post dict as collected by bluesky_auto_post.main()."""
+    return {'post_id': post_id,
+            'front_matter': {'title': post_id, 'date': TODAY - timedelta(days=days_old), 'tags': list(tags),
+                             **front_matter}}
+
+
+def test_priority_and_immediate():
+    """Newer, weighted and tagged posts rank higher; only the newest skip the queue."""
+    new, old = post('new', 10), post('old', 400)
+    assert priority(new['front_matter'], TODAY, CONFIG) > priority(old['front_matter'], TODAY, CONFIG)
+    tagged = post('tagged', 400, tags=['Nautobot'])
+    assert priority(tagged['front_matter'], TODAY, CONFIG) > priority(old['front_matter'], TODAY, CONFIG)
+    weighted = post('weighted', 400, announce_weight=20)
+    assert priority(weighted['front_matter'], TODAY, CONFIG) > priority(new['front_matter'], TODAY, CONFIG)
+    assert is_immediate(post('today', 0)['front_matter'], TODAY, CONFIG)
+    assert not is_immediate(new['front_matter'], TODAY, CONFIG)
+
+
+def test_release_is_throttled_and_persistent():
+    """Releases take the top posts, respect the interval and survive a reload."""
+    backlog = [post('old', 400), post('new', 10), post('tagged', 400, tags=['nautobot']),
+               post('weighted', 700, announce_weight=20)]
+    queue = load_queue('/nonexistent/queue.json')
+    assert sync_queue(queue, backlog, TODAY, CONFIG) == (4, 0)
+
+    now = datetime(2025, 11, 10, 12, tzinfo=timezone.utc)
+    assert release_due(queue, now, CONFIG) == ['weighted', 'new']
+    # Nothing more until the interval has passed, even after a reload
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, 'queue.json')
+        save_queue(queue, path)
+        queue = load_queue(path)
+    assert release_due(queue, now + timedelta(hours=23), CONFIG) == []
+
+    # Released posts that were announced drop out on the next sync
+    assert sync_queue(queue, backlog[:1] + backlog[2:3], TODAY, CONFIG) == (0, 2)
+    assert release_due(queue, now + timedelta(hours=24), CONFIG) == ['tagged', 'old']
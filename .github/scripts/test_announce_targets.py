@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-network fan-out, against local stub servers.
+"""
+
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from atproto import exceptions as atproto_exceptions
+
+from announce_targets import (Announcement, BlueskyTarget, MastodonTarget, RetryPolicy, WebhookTarget,
+                              fan_out, is_retryable, posted_targets, record_key)
+
+FAST_RETRY = RetryPolicy(attempts=3, backoff=0.01, max_backoff=0.05)
+ANNOUNCEMENTS = [
+    Announcement(f"docs/blog/posts/2025/post-{n}.md", f"Post {n}", "A summary.",
+                 f"https://netdevops.it/blog/post-{n}/", ["automation"])
+    for n in range(3)
+]
+
+
+def fake_jwt():
+    """An unsigned JWT the atproto client can read the expiry from."""
+    def encode(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    return f"{encode({'alg': 'none'})}.{encode({'sub': 'did:plc:test', 'exp': int(time.time()) + 3600})}.sig"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers like Bluesky, Mastodon and a webhook receiver."""
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=None):
+        data = json.dumps(body or {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.startswith("/xrpc/app.bsky.actor.getProfile"):
+            return self.reply(200, {"did": "did:plc:test", "handle": "test.bsky.social"})
+        if self.path.startswith("/xrpc/com.atproto.repo.getRecord"):
+            rkey = parse_qs(urlsplit(self.path).query)["rkey"][0]
+            if rkey not in self.server.records:
+                return self.reply(400, {"error": "RecordNotFound", "message": "Could not locate record"})
+            return self.reply(200, {"uri": f"at://did:plc:test/app.bsky.feed.post/{rkey}", "cid": "bafyrecord",
+                                    "value": self.server.records[rkey]})
+        self.reply(404)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.calls.append(self.path)
+        if self.path == "/xrpc/com.atproto.server.createSession":
+            jwt = fake_jwt()
+            return self.reply(200, {"did": "did:plc:test", "handle": "test.bsky.social",
+                                    "accessJwt": jwt, "refreshJwt": jwt})
+        if self.path == "/xrpc/com.atproto.repo.createRecord":
+            data = json.loads(body)
+            with server.lock:
+                if data["rkey"] in server.records:
+                    return self.reply(400, {"error": "InvalidRequest", "message": "Record already exists"})
+                server.records[data["rkey"]] = data["record"]
+                lost = server.lost_responses > 0
+                server.lost_responses -= 1
+            if lost:
+                return self.reply(504, {"error": "GatewayTimeout"})  # stored, but the client never hears of it
+            return self.reply(200, {"uri": f"at://did:plc:test/app.bsky.feed.post/{data['rkey']}",
+                                    "cid": "bafyrecord"})
+        if self.path == "/api/v1/statuses":
+            status = parse_qs(body.decode())["status"][0]
+            with server.lock:
+                server.statuses.append((status, self.headers["Idempotency-Key"]))
+                number = len(server.statuses)
+            return self.reply(200, {"id": str(number), "url": f"https://mastodon.test/@me/{number}"})
+        if self.path == "/hook":
+            with server.lock:
+                server.hook_attempts += 1
+                fail = server.hook_attempts <= server.hook_failures
+            if fail:
+                return self.reply(503, {"error": "unavailable"})
+            with server.lock:
+                server.hooks.append(json.loads(body))
+            return self.reply(200)
+        if self.path == "/slow-hook":
+            time.sleep(server.slow_delay)
+            return self.reply(200)
+        if self.path == "/broken-hook":
+            return self.reply(400, {"error": "bad request"})
+        self.reply(404)
+
+
+def start_server(hook_failures=0, slow_delay=0.0, lost_responses=0):
+    """Start a stub server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.calls, server.records, server.statuses, server.hooks = [], {}, [], []
+    server.lost_responses = lost_responses
+    server.hook_attempts, server.hook_failures, server.slow_delay = 0, hook_failures, slow_delay
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_fan_out_to_all_targets():
+    """Every target posts every announcement once and gets its own log entry."""
+    server, base = start_server(hook_failures=1)
+    try:
+        targets = [
+            BlueskyTarget("test.bsky.social", "app-password", base_url=f"{base}/xrpc",
+                          site_dir="/nonexistent", retry=FAST_RETRY, rate_per_minute=6000),
+            MastodonTarget(base, "token", retry=FAST_RETRY, rate_per_minute=6000),
+            WebhookTarget(f"{base}/hook", secret="s3cret", retry=FAST_RETRY, rate_per_minute=6000),
+        ]
+        posted_log = {ANNOUNCEMENTS[0].post_id: {"posted_at": "2025-01-01T00:00:00+00:00",
+                                                 "title": "Post 0", "url": ANNOUNCEMENTS[0].url}}
+        saves = []
+        results = fan_out(ANNOUNCEMENTS, targets, posted_log, lambda log: saves.append(len(log)))
+
+        # The legacy entry counts as already posted on Bluesky
+        assert results["bluesky"] == {"posted": 2, "failed": 0, "skipped": 1}
+        assert results["mastodon"] == {"posted": 3, "failed": 0, "skipped": 0}
+        assert results["webhook"] == {"posted": 3, "failed": 0, "skipped": 0}
+        assert server.hook_attempts == 4  # one 503 retried
+        assert len(server.records) == 2 and len(server.statuses) == 3 and len(server.hooks) == 3
+        assert all(record["facets"] for record in server.records.values())
+        assert len(saves) == 8
+        for announcement in ANNOUNCEMENTS:
+            assert posted_targets(posted_log[announcement.post_id]) == {"bluesky", "mastodon", "webhook"}
+        assert posted_log[ANNOUNCEMENTS[0].post_id]["targets"]["bluesky"]["posted_at"].startswith("2025-01-01")
+
+        # A second run posts nothing
+        results = fan_out(ANNOUNCEMENTS, targets, posted_log)
+        assert all(counts["posted"] == 0 and counts["skipped"] == 3 for counts in results.values())
+    finally:
+        server.shutdown()
+
+
+def test_slow_and_failing_targets_do_not_block():
+    """A failing target is not retried on client errors and a slow one does not delay the others."""
+    server, base = start_server(slow_delay=0.5)
+    try:
+        slow = WebhookTarget(f"{base}/slow-hook", retry=FAST_RETRY, rate_per_minute=6000)
+        slow.name = "slow"
+        broken = WebhookTarget(f"{base}/broken-hook", retry=FAST_RETRY, rate_per_minute=6000)
+        broken.name = "broken"
+        fast = MastodonTarget(base, "token", retry=FAST_RETRY, rate_per_minute=6000)
+
+        finished = {}
+        original = fast.publish
+
+        def timed_publish(announcement):
+            result = original(announcement)
+            finished[announcement.post_id] = time.monotonic()
+            return result
+        fast.publish = timed_publish
+
+        start = time.monotonic()
+        posted_log = {}
+        results = fan_out(ANNOUNCEMENTS, [slow, broken, fast], posted_log)
+        assert results["broken"] == {"posted": 0, "failed": 3, "skipped": 0}
+        assert server.calls.count("/broken-hook") == 3  # 400 is not retried
+        assert results["slow"]["posted"] == 3 and results["mastodon"]["posted"] == 3
+        assert max(finished.values()) - start < 0.5
+        assert all("broken" not in entry["targets"] for entry in posted_log.values())
+    finally:
+        server.shutdown()
+
+
+
+def test_bluesky_retry_does_not_post_twice():
+    """A post stored before its response was lost is found again instead of created twice."""
+    server, base = start_server(lost_responses=1)
+    try:
+        target = BlueskyTarget("test.bsky.social", "app-password", base_url=f"{base}/xrpc",
+                               site_dir="/nonexistent", retry=FAST_RETRY, rate_per_minute=6000)
+        fields = target.publish(ANNOUNCEMENTS[0])
+        assert len(server.records) == 1
+        assert fields["uri"] == f"at://did:plc:test/app.bsky.feed.post/{next(iter(server.records))}"
+        assert server.calls.count("/xrpc/com.atproto.repo.createRecord") == 1
+    finally:
+        server.shutdown()
+
+
+def test_record_keys_are_tids():
+    """Record keys sort by time and differ per post."""
+    first, second = record_key("docs/a.md", now=1_700_000_000), record_key("docs/a.md", now=1_700_000_001)
+    assert len(first) == 13 and first[0] in "234567abcdefghij"
+    assert first < second
+    assert record_key("docs/b.md", now=1_700_000_000) != first
+
+
+def test_only_transient_errors_are_retried():
+    """Network errors, timeouts, 429 and 5xx are retried; everything else fails at once."""
+    def http_error(status):
+        response = requests.Response()
+        response.status_code = status
+        return requests.HTTPError(response=response)
+
+    assert is_retryable(requests.ConnectionError()) and is_retryable(requests.Timeout())
+    assert is_retryable(atproto_exceptions.InvokeTimeoutError())
+    assert is_retryable(http_error(429)) and is_retryable(http_error(503))
+    assert not is_retryable(http_error(400)) and not is_retryable(http_error(401))
+    assert not is_retryable(ValueError("bad payload")) and not is_retryable(KeyError("uri"))
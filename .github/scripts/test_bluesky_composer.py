@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass Bluesky post composer.
+"""
+
+import bluesky_auto_post
+from bluesky_composer import MAX_GRAPHEMES, compose_many, compose_post, grapheme_len
+
+URL = "https://netdevops.it/blog/building-a-reusable-network-automation-lab-with-containerlab/"
+
+
+def facet_texts(post):
+    """Return the text each facet points at, using its byte offsets."""
+    data = post.text.encode("utf-8")
+    return [data[f["index"]["byteStart"]:f["index"]["byteEnd"]].decode("utf-8") for f in post.facets]
+
+
+def test_grapheme_counting():
+    """Emoji sequences, flags and combining marks count as one grapheme."""
+    assert grapheme_len("abc") == 3
+    assert grapheme_len("👩‍💻") == 1
+    assert grapheme_len("👍🏽") == 1
+    assert grapheme_len("🇳🇱🇧🇪") == 2
+    assert grapheme_len("é") == 1
+    assert grapheme_len("한국어") == 3
+
+
+def test_short_post_keeps_everything():
+    """A short post contains title, summary, tags and a link facet on the URL."""
+    post = compose_post("Lab with Containerlab", "A short summary.", URL, ["containerlab", "network-automation"])
+    assert "Lab with Containerlab" in post.text
+    assert "A short summary." in post.text
+    assert "#containerlab #networkautomation" in post.text
+    assert post.text.endswith(URL)
+    assert facet_texts(post) == ["#containerlab", "#networkautomation", URL]
+
+
+def test_long_non_ascii_post_fits_exactly():
+    """Emoji and accents do not push the post over the limit or break facets."""
+    title = "Ünïcödé 🚀 Nautobot Zero to Hero 👩‍💻 " * 3
+    summary = "Überblick über Netzwerkautomatisierung 🇳🇱 " * 20
+    post = compose_post(title, summary, URL, ["nautobot"])
+    assert post.graphemes <= MAX_GRAPHEMES
+    assert post.graphemes == grapheme_len(post.text)
+    assert post.bytes == len(post.text.encode("utf-8"))
+    assert facet_texts(post)[-1] == URL
+
+
+def test_summary_fills_remaining_space():
+    """A truncated summary uses the whole budget instead of a fixed margin."""
+    post = compose_post("Title", "word " * 200, URL, [])
+    # Only trailing whitespace before the ellipsis may be left unused
+    assert MAX_GRAPHEMES - 1 <= post.graphemes <= MAX_GRAPHEMES
+
+
+def test_compose_many():
+    """The batch API composes every post keyed by post id."""
+    posts = [
+        {"post_id": "a.md", "title": "A", "summary": "", "url": URL, "tags": []},
+        {"post_id": "b.md", "title": "B", "summary": "Summary", "url": URL, "tags": ["x"]},
+    ]
+    composed = compose_many(posts)
+    assert sorted(composed) == ["a.md", "b.md"]
+    assert all(post.text.endswith(URL) for post in composed.values())
+
+
+def test_archive_preview_goes_through_the_composer(tmp_path, monkeypatch, capsys):
+    """bluesky_auto_post reads the posts' front matter and composes each one."""
+    posts_dir = tmp_path / "posts"
+    posts_dir.mkdir()
+    (posts_dir / "lab.md").write_text(
+        "---\ntitle: Lab with Containerlab\ndate: 2025-01-10\nsummary: " + "Long summary. " * 40 +
+        "\ntags: [containerlab]\n---\n\n# Lab\n", encoding="utf-8")
+    (posts_dir / "draft.md").write_text("---\ntitle: No date\n---\n", encoding="utf-8")
+    monkeypatch.setattr(bluesky_auto_post, "BLOG_POSTS_DIR", str(posts_dir))
+
+    bluesky_auto_post.preview_archive()
+    output = capsys.readouterr().out
+    assert "✅ Composed 1 posts" in output
+    assert "https://netdevops.it/blog/lab-with-containerlab/" in output
+    graphemes = int(output.split(" graphemes")[0].rsplit("(", 1)[1])
+    assert graphemes <= MAX_GRAPHEMES
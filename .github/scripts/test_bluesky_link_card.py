@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for Bluesky link cards built from the local site.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from bluesky_link_card import external_embed, read_link_card, thumbnail_blob
+
+URL = "https://netdevops.it/blog/netdata-monitoring-system-real-time-free-and-easy/"
+
+PAGE = """<!doctype html><html><head>
+<title>Netdata - NetDevOps.it</title>
+<meta name="description" content="Site description">
+<meta property="og:title" content="Netdata Monitoring System">
+<meta property="og:description" content="Real-time monitoring &amp; alerts.">
+<meta property="og:image" content="https://netdevops.it/images/tools/netdata/overview.png">
+</head><body><h1>Netdata</h1></body></html>"""
+
+
+def make_site(root):
+    """Write a one-page site with an image."""
+    page = Path(root, "blog/netdata-monitoring-system-real-time-free-and-easy/index.html")
+    page.parent.mkdir(parents=True)
+    page.write_text(PAGE, encoding="utf-8")
+    image = Path(root, "images/tools/netdata/overview.png")
+    image.parent.mkdir(parents=True)
+    image.write_bytes(b"\x89PNG fake image")
+    return image
+
+
+def test_card_from_built_page():
+    """Title, description and thumbnail come from the OpenGraph tags."""
+    with tempfile.TemporaryDirectory() as site:
+        image = make_site(site)
+        card = read_link_card(URL, site)
+        assert card["title"] == "Netdata Monitoring System"
+        assert card["description"] == "Real-time monitoring & alerts."
+        assert card["image"] == image
+        assert read_link_card("https://netdevops.it/blog/missing/", site) is None
+        assert read_link_card("https://example.com/", site) is None
+
+
+def test_thumbnail_uploaded_once():
+    """The same image content is uploaded once and then served from the cache."""
+    uploads = []
+
+    def upload(data):
+        uploads.append(data)
+        return {"$type": "blob", "ref": {"$link": "bafkrei-test"}, "mimeType": "image/png", "size": len(data)}
+
+    with tempfile.TemporaryDirectory() as site:
+        image = make_site(site)
+        copy = Path(site, "images/copy.png")
+        copy.write_bytes(image.read_bytes())
+        cache = {}
+        first, uploaded = thumbnail_blob(image, cache, upload)
+        assert uploaded
+        again, uploaded = thumbnail_blob(copy, cache, upload)
+        assert not uploaded and again == first
+        assert len(uploads) == 1
+
+        embed = external_embed(read_link_card(URL, site), first)
+        assert embed["$type"] == "app.bsky.embed.external"
+        assert embed["external"]["thumb"]["ref"]["$link"] == "bafkrei-test"
+
+
+
+def test_card_found_through_the_page_manifest():
+    """A post is looked up by its source file and the card links to the built URL."""
+    with tempfile.TemporaryDirectory() as site:
+        make_site(site)
+        built = "blog/netdata-monitoring-system-real-time-free-and-easy/"
+        manifest = {"pages": [{"src": "blog/posts/2025/netdata.md", "url": built, "dest": built + "index.html"}]}
+        Path(site, "page-manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        card = read_link_card("https://netdevops.it/blog/derived-slug/", site, "docs/blog/posts/2025/netdata.md")
+        assert card["uri"] == URL
+        assert card["title"] == "Netdata Monitoring System"
+        assert read_link_card("https://netdevops.it/blog/derived-slug/", site, "docs/blog/posts/other.md") is None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the sharded search index builder.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import bench_search_index
+from build_search_shards import build_shards, shard_filename, stub_search_index, write_shards
+
+INDEX = {
+    'config': {'separator': r'[\s\-]+'},
+    'docs': [
+        {'location': 'blog/nautobot-jobs/', 'title': 'Nautobot Jobs', 'text': '<p>Write jobs for Nautobot</p>'},
+        {'location': 'ansible/role/', 'title': 'Ansible role', 'text': '<p>Install Nautobot with Ansible</p>',
+         'tags': ['docker']},
+        {'location': 'blog/nautobot-jobs/#testing', 'title': 'Testing', 'text': '<p>Test the jobs</p>'},
+        {'location': 'blog/pyats/', 'title': 'pyATS', 'text': '<p>Network testing &amp; validation</p>'},
+    ],
+}
+
+
+def test_sections_are_contiguous_and_chunked():
+    """Documents are renumbered per section and split into chunks."""
+    manifest, shards, chunks = build_shards(INDEX, chunk_size=2)
+    assert manifest['count'] == 4
+    assert manifest['chunks'] == [['ansible-0', 0], ['blog-0', 1], ['blog-1', 3]]
+    assert [doc[0] for doc in chunks['blog-0']] == ['blog/nautobot-jobs/', 'blog/nautobot-jobs/#testing']
+    assert chunks['blog-1'][0] == ['blog/pyats/', 'pyATS', 'Network testing & validation']
+
+
+def test_postings_weight_titles_and_tags():
+    """Postings are [doc, weight, ...] sorted by doc; titles and tags are boosted."""
+    manifest, shards, _ = build_shards(INDEX)
+    assert shards['na']['nautobot'] == [0, 1, 1, 11]
+    assert shards['do']['docker'] == [0, 10]
+    assert 'the' not in shards.get('th', {})  # stop word
+    assert sorted(manifest['shards']) == manifest['shards']
+
+
+def test_write_shards_and_stub_index():
+    """Shards land below search/shards and the monolithic index is emptied."""
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest, shards, chunks = build_shards(INDEX)
+        total = write_shards(tmp, manifest, shards, chunks)
+        out = Path(tmp, 'search', 'shards')
+        assert (out / 'manifest.json').exists() and (out / 'terms' / 'na.json').exists()
+        assert total == sum(f.stat().st_size for f in out.rglob('*.json'))
+
+        index_file = Path(tmp, 'search_index.json')
+        stub_search_index(index_file, INDEX)
+        assert json.loads(index_file.read_text()) == {'config': INDEX['config'], 'docs': []}
+
+
+def test_shard_filename_is_filesystem_safe():
+    """Non-ASCII and punctuation are escaped."""
+    assert shard_filename('na') == 'na.json'
+    assert shard_filename('é.') == '~e9~2e.json'
+
+
+def test_benchmark_refuses_a_stubbed_index(tmp_path, monkeypatch, capsys):
+    """Comparing against an emptied search_index.json would report nonsense."""
+    manifest, shards, chunks = build_shards(INDEX)
+    write_shards(tmp_path, manifest, shards, chunks)
+    index_file = tmp_path / 'search' / 'search_index.json'
+    stub_search_index(index_file, INDEX)
+    monkeypatch.setattr('sys.argv', ['bench_search_index.py', '--site-dir', str(tmp_path)])
+    assert bench_search_index.main() == 1
+    assert 'is empty' in capsys.readouterr().out
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared stage timing and metrics output.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import instrumentation
+from instrumentation import count, stage, timed
+
+
+@timed("slug")
+def slugify(title):
+    return title.lower().replace(" ", "-")
+
+
+def test_json_lines_are_appended_per_run():
+    """Stages add up across calls and each run appends one record."""
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics_file = str(Path(tmp, "{script}.jsonl"))
+        for _ in range(2):
+            with instrumentation.instrumented("demo", metrics_file=metrics_file):
+                with stage("scan"):
+                    for title in ("Hello World", "Nautobot Jobs"):
+                        count("files_read")
+                        slugify(title)
+        records = [json.loads(line) for line in Path(tmp, "demo.jsonl").read_text().splitlines()]
+    assert len(records) == 2
+    record = records[-1]
+    assert record["script"] == "demo" and record["status"] == "ok"
+    assert record["stages"]["slug"]["calls"] == 2 and record["stages"]["scan"]["calls"] == 1
+    assert record["counters"] == {"files_read": 2}  # reset between runs
+
+
+def test_prometheus_textfile_marks_failures():
+    """A .prom file is replaced on each run and records failed runs."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "demo.prom")
+        try:
+            with instrumentation.instrumented("demo", metrics_file=str(path)):
+                count("http_calls", 3)
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+        text = path.read_text()
+        assert not list(Path(tmp).glob(".*.tmp"))
+    assert 'automation_run_success{script="demo"} 0' in text
+    assert 'automation_events{script="demo",name="http_calls"} 3' in text
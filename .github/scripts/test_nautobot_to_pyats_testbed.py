@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the Nautobot to pyATS testbed exporter.
+"""
+
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "docs" / "scripts"))
+
+import nautobot_to_pyats_testbed as exporter
+
+BASE_URL = "https://nautobot.test/api"
+
+
+class FakeNautobot:
+    """Serves list endpoints with a page size cap, like Nautobot's MAX_PAGE_SIZE."""
+
+    def __init__(self, lists, max_page_size=3):
+        self.lists = lists
+        self.max_page_size = max_page_size
+        self.requests = []
+
+    def get(self, url, params=None):
+        parts = urlsplit(url)
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        query.update(params or {})
+        self.requests.append((parts.path, int(query["offset"])))
+        rows = self.lists[parts.path.removeprefix("/api/").rstrip("/")]
+        offset, limit = int(query["offset"]), min(int(query["limit"]), self.max_page_size)
+        end = offset + limit
+        return {
+            "count": len(rows),
+            "results": rows[offset:end],
+            "next": f"https://{parts.netloc}{parts.path}?limit={limit}&offset={end}" if end < len(rows) else None,
+        }
+
+
+@pytest.fixture
+def nautobot(monkeypatch):
+    server = FakeNautobot({"dcim/devices": list(range(10)), "dcim/cables": list(range(4))})
+    monkeypatch.setattr(exporter, "NAUTOBOT_URL", BASE_URL)
+    monkeypatch.setattr(exporter, "api_get", server.get)
+    return server
+
+
+def test_pages_follow_the_page_size_the_server_returns(nautobot):
+    """A server capping the page size below PAGE_SIZE still yields every row once."""
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        devices, cables = exporter.api_get_lists(["dcim/devices", "dcim/cables"], {"site": "ams"}, pool)
+    assert devices == list(range(10)) and cables == list(range(4))
+    assert sorted(offset for path, offset in nautobot.requests if path == "/api/dcim/devices/") == [0, 3, 6, 9]
+
+
+def test_a_list_that_changes_while_paged_is_read_again(nautobot, monkeypatch):
+    """When the rows do not add up to the count, the list is read again through the next links."""
+    original, changed = nautobot.get, []
+
+    def changing(url, params=None):
+        page = original(url, params)
+        if params and params["offset"] == 0 and not changed:
+            changed.append(True)
+            nautobot.lists["dcim/devices"] = list(range(1, 10))  # device 0 was deleted after the first page
+        return page
+
+    monkeypatch.setattr(exporter, "api_get", changing)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        devices = exporter.api_get_all("dcim/devices", {}, pool)
+    assert devices == list(range(1, 10))
+
+
+def test_interface_type():
+    """Nautobot 1.x strings and 2.x choice dicts map onto pyATS link types."""
+    assert exporter.interface_type({"type": "1000base-t"}) == "ethernet"
+    assert exporter.interface_type({"type": {"value": "lag", "label": "LAG"}}) == "lag"
+    assert exporter.interface_type({"type": "virtual"}) == "virtual"
+    assert exporter.interface_type({}) == "ethernet"
+
+
+def test_build_topology_keeps_links_inside_the_testbed():
+    """Cables become links; ends outside the testbed or not on interfaces are dropped."""
+    devices = [{"id": "d1", "name": "r1"}, {"id": "d2", "name": "r2"}, {"id": "d3", "name": "r3"}]
+    interfaces = [
+        {"id": "i1", "name": "Gi0/0", "device": {"id": "d1"}, "type": "1000base-t"},
+        {"id": "i2", "name": "Gi0/0", "device": {"id": "d2"}, "type": {"value": "1000base-t"}},
+        {"id": "i3", "name": "Po1", "device": {"id": "d2"}, "type": "lag"},
+        {"id": "i4", "name": "Gi0/1", "device": {"id": "d3"}, "type": "1000base-t"},
+    ]
+    cables = [
+        {"termination_a_id": "i1", "termination_b_id": "i2"},
+        {"termination_a_id": "i3", "termination_b_id": "i4", "label": "to-r3"},
+        {"termination_a_id": "i1", "termination_b_id": "circuit-1"},
+    ]
+    topology = exporter.build_topology(devices, interfaces, cables, {"r1": {}, "r2": {}})
+    assert topology == {
+        "r1": {"interfaces": {"Gi0/0": {"type": "ethernet", "link": "r1_Gi0/0--r2_Gi0/0"}}},
+        "r2": {"interfaces": {"Gi0/0": {"type": "ethernet", "link": "r1_Gi0/0--r2_Gi0/0"}}},
+    }
+
+
+def make_testbed(*names, ip="10.0.0.1"):
+    """A testbed with one device per name."""
+    return {"devices": {name: {"os": "iosxe", "connections": {"cli": {"protocol": "ssh", "ip": ip}}}
+                        for name in names}}
+
+
+def test_diff_testbeds_reports_device_changes():
+    """Devices are compared by the hash of their entry and topology."""
+    old = make_testbed("r1", "r2", "r3")
+    new = make_testbed("r2", "r3", "r4")
+    new["devices"]["r3"]["os"] = "nxos"
+    new["topology"] = {"r2": {"interfaces": {"Gi0/0": {"type": "ethernet", "link": "x"}}}}
+    changes = exporter.diff_testbeds(old, new)
+    assert changes["added"] == ["r4"] and changes["removed"] == ["r1"]
+    assert changes["changed"] == ["r2", "r3"] and changes["unchanged"] == 0
+    assert not changes["other_sections_changed"]
+    assert exporter.diff_testbeds(old, {**old, "testbed": {"name": "lab"}})["other_sections_changed"]
+
+
+def test_unchanged_testbed_is_not_rewritten(tmp_path):
+    """The file is only replaced when a device changed, and keeps its mode."""
+    path, changes_path = tmp_path / "testbed.yml", tmp_path / "changes.json"
+    changes = exporter.write_testbed(make_testbed("r2", "r1"), str(path), str(changes_path))
+    assert changes["written"] and changes["added"] == ["r1", "r2"]
+    assert list(exporter.load_testbed(str(path))["devices"]) == ["r1", "r2"]
+    path.chmod(0o640)
+    written = path.stat().st_mtime_ns
+
+    changes = exporter.write_testbed(make_testbed("r1", "r2"), str(path), str(changes_path))
+    assert not changes["written"] and changes["unchanged"] == 2
+    assert path.stat().st_mtime_ns == written
+    assert '"written": false' in changes_path.read_text(encoding="utf-8")
+
+    changes = exporter.write_testbed(make_testbed("r1", "r2", ip="10.0.0.2"), str(path))
+    assert changes["written"] and changes["changed"] == ["r1", "r2"]
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert not list(tmp_path.glob(".testbed.yml.*"))
+
+
+def test_new_files_get_the_umask_mode(tmp_path):
+    """A new file is readable like any other file, not owner-only as mkstemp makes it."""
+    path = tmp_path / "new.yml"
+    exporter.write_atomic(str(path), "devices: {}\n")
+    umask = os.umask(0)
+    os.umask(umask)
+    assert path.stat().st_mode & 0o777 == 0o666 & ~umask
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for the post-build HTML optimiser.
+"""
+
+from pathlib import Path
+
+from optimize_html import DEFERRED_LOADER, INLINE_CSS_LIMIT, optimize_html, process_page
+
+PAGE = """<html><head>
+<link rel="stylesheet" href="../assets/stylesheets/main.css">
+<link rel="stylesheet" href="../css/full-width.css">
+<link rel="stylesheet" href="../css/large.css">
+<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/cookieconsent@3/build/cookieconsent.min.css">
+</head><body>
+<header><img src="../logo.png"></header>
+<article>
+<img src="hero.png" alt="Hero">
+<p>Text</p>
+<img src="diagram.png" alt="Diagram">
+<iframe src="https://www.youtube.com/embed/x"></iframe>
+<video src="demo.mp4"></video>
+</article>
+<script src="../js/giscus.js"></script>
+<script src="https://cdn.jsdelivr.net/npm/cookieconsent@3/build/cookieconsent.min.js"></script>
+<script src="../js/cookieconsent-init.js"></script>
+<script src="https://cdn.jsdelivr.net/gh/zarocknz/javascript-winwheel@2.7.0/Winwheel.min.js"></script>
+</body></html>
+"""
+
+
+def make_site(root):
+    """A built site with one page and a small and a large stylesheet."""
+    (root / 'css').mkdir()
+    (root / 'css' / 'full-width.css').write_text('.md-grid{max-width:none}', encoding='utf-8')
+    (root / 'css' / 'large.css').write_text('a{}' * INLINE_CSS_LIMIT, encoding='utf-8')
+    page = root / 'blog' / 'index.html'
+    page.parent.mkdir()
+    page.write_text(PAGE, encoding='utf-8')
+    return page
+
+
+def test_first_article_image_is_eager_and_the_rest_lazy(tmp_path):
+    """Only the first image of the article is loaded eagerly."""
+    html = optimize_html(PAGE, make_site(tmp_path), tmp_path)
+    assert '<img src="../logo.png" decoding="async" loading="lazy">' in html
+    assert '<img src="hero.png" alt="Hero" decoding="async">' in html
+    assert '<img src="diagram.png" alt="Diagram" decoding="async" loading="lazy">' in html
+    assert '<iframe src="https://www.youtube.com/embed/x" loading="lazy">' in html
+    assert '<video src="demo.mp4" preload="none">' in html
+
+
+def test_widgets_wait_for_interaction(tmp_path):
+    """The consent widget loads on interaction, comments on visibility, the wheel not at all."""
+    html = optimize_html(PAGE, make_site(tmp_path), tmp_path)
+    assert '<script type="text/plain" data-deferred-src="../js/cookieconsent-init.js"></script>' in html
+    assert '<script src="https://cdn.jsdelivr.net/npm/cookieconsent' not in html
+    assert html.count(DEFERRED_LOADER) == 1 and 'pointerdown' in DEFERRED_LOADER
+    assert 'cookieconsent.min.css" media="print"' in html
+    assert 'Winwheel' not in html
+    # giscus.js is left alone: it only fetches the comments when they scroll into view
+    assert '<script src="../js/giscus.js"></script>' in html
+    assert 'IntersectionObserver' in Path(__file__).resolve().parents[2].joinpath('docs/js/giscus.js').read_text()
+
+
+def test_small_local_css_is_inlined(tmp_path):
+    """Small local stylesheets are inlined; large, theme and remote ones stay links."""
+    html = optimize_html(PAGE, make_site(tmp_path), tmp_path)
+    assert '<style>.md-grid{max-width:none}</style>' in html
+    assert 'href="../css/large.css"' in html and 'href="../assets/stylesheets/main.css"' in html
+
+
+def test_optimising_twice_changes_nothing(tmp_path):
+    """The transform is idempotent."""
+    page = make_site(tmp_path)
+    once = optimize_html(PAGE, page, tmp_path)
+    assert optimize_html(once, page, tmp_path) == once
+    assert once.count('cookieconsent.min.css') == 2  # the print link and its <noscript> fallback
+
+
+def test_cache_hits_on_repeated_runs(tmp_path):
+    """Unchanged pages and the optimiser's own output are served from the cache."""
+    site, cache = tmp_path / 'site', tmp_path / 'cache'
+    site.mkdir()
+    cache.mkdir()
+    page = make_site(site)
+    result, keys = process_page(page, site, cache)
+    assert result == 'optimized' and len(keys) == 2
+    optimized = page.read_bytes()
+
+    # A second run over the same, already optimised site
+    result, second_keys = process_page(page, site, cache)
+    assert result == 'cached' and keys[1] in second_keys
+    assert page.read_bytes() == optimized
+
+    # A fresh build writes the original page again
+    page.write_text(PAGE, encoding='utf-8')
+    result, third_keys = process_page(page, site, cache)
+    assert result == 'cached' and set(third_keys) == set(keys)
+    assert page.read_bytes() == optimized
+
+    page.write_text(PAGE.replace('Text', 'New text'), encoding='utf-8')
+    assert process_page(page, site, cache)[0] == 'optimized'
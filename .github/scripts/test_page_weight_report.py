@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the page-weight and budget report.
+"""
+
+import tempfile
+from pathlib import Path
+
+from page_weight_report import build_report, budgets_for, render_markdown
+
+CONFIG = {
+    'defaults': {'html_bytes': 10_000, 'total_bytes': 20_000, 'third_party_requests': 1},
+    'pages': [{'match': 'blog/*', 'total_bytes': 5_000}],
+    'regression_threshold': 0.10,
+}
+
+
+def make_site(root):
+    """A tiny built site: a light page and a blog post with a large image."""
+    (root / 'css').mkdir()
+    (root / 'css' / 'site.css').write_text('body{}' * 100)
+    (root / 'index.html').write_text('<link rel="stylesheet" href="css/site.css">'
+                                     '<script src="https://cdn.example.com/x.js"></script>')
+    (root / 'blog' / 'post').mkdir(parents=True)
+    (root / 'blog' / 'post' / 'big.png').write_bytes(b'\0' * 8_000)
+    (root / 'blog' / 'post' / 'index.html').write_text('<img src="big.png"><img src="missing.png">'
+                                                      '<link rel="stylesheet" href="../../css/site.css">')
+
+
+def test_budgets_use_the_last_matching_rule():
+    """Page rules override the defaults."""
+    assert budgets_for('blog/post/index.html', CONFIG)['total_bytes'] == 5_000
+    assert budgets_for('index.html', CONFIG)['total_bytes'] == 20_000
+
+
+def test_report_measures_budgets_and_regressions():
+    """Assets are counted once, over-budget and regressed pages are listed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        site = Path(tmp)
+        make_site(site)
+        report = build_report(site, CONFIG)
+        post = report['pages']['blog/post/index.html']
+        assert post['largest_image'] == 'blog/post/big.png' and post['largest_image_bytes'] == 8_000
+        assert post['missing_assets'] == ['missing.png']
+        assert report['pages']['index.html']['third_party_requests'] == 1
+        assert report['over_budget'] == ['blog/post/index.html']
+
+        previous = {'pages': {'index.html': dict(report['pages']['index.html'], html_bytes=10)},
+                    'totals': report['totals']}
+        report = build_report(site, CONFIG, previous)
+    assert report['regressed'] == ['index.html']
+    assert report['added_pages'] == ['blog/post/index.html']
+    markdown = render_markdown(report)
+    assert '### ❌ Over budget' in markdown and '### ⚠️ Regressions' in markdown
+
+
+def test_overlay_reports_only_its_pages(tmp_path):
+    """An overlay is measured with assets from the full build and not compared as a whole site."""
+    full, overlay = tmp_path / 'full', tmp_path / 'overlay'
+    full.mkdir()
+    make_site(full)
+    (overlay / 'blog' / 'post').mkdir(parents=True)
+    (overlay / 'blog' / 'post' / 'index.html').write_text((full / 'blog' / 'post' / 'index.html').read_text())
+    previous = {'pages': {'index.html': {'total_bytes': 100},
+                          'blog/post/index.html': {'html_bytes': 10, 'total_bytes': 10}},
+                'totals': {'html_bytes': 1, 'total_bytes': 1}}
+    report = build_report(overlay, CONFIG, previous, asset_dir=full)
+    post = report['pages']['blog/post/index.html']
+    assert list(report['pages']) == ['blog/post/index.html']
+    assert post['largest_image'] == 'blog/post/big.png' and post['missing_assets'] == ['missing.png']
+    assert report['removed_pages'] == [] and report['regressed'] == ['blog/post/index.html']
+    assert report['previous_totals'] == {'html_bytes': 10, 'total_bytes': 10}
+    assert 'Changed pages only' in render_markdown(report)
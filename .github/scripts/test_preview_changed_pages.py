@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the changed-pages-only preview plan.
+"""
+
+import subprocess
+
+from preview_changed_pages import make_plan, merge_changes, preview_exists, rebuild_set, stub_markdown
+
+
+def test_full_build_for_config_and_removed_pages():
+    """Site-wide inputs and deletions cannot be overlaid."""
+    assert make_plan([('M', 'mkdocs.yml')])['mode'] == 'full'
+    assert make_plan([('M', 'hooks/open_graph.py')])['mode'] == 'full'
+    plan = make_plan([('M', 'docs/tutorials.md'), ('D', 'docs/old.md')])
+    assert plan['mode'] == 'full' and plan['reason'] == "docs/old.md was removed"
+    assert make_plan([], full_reason="pull request opened")['mode'] == 'full'
+
+
+def test_overlay_for_pages_and_static_files(tmp_path):
+    """Changed pages and assets are overlaid; blog posts pull in their listings."""
+    docs = tmp_path / 'docs'
+    (docs / 'blog' / 'posts' / '2025').mkdir(parents=True)
+    (docs / 'tutorials.md').write_text("# Tutorials\n", encoding='utf-8')
+    (docs / 'blog' / 'posts' / '2025' / 'post.md').write_text("# Post\n", encoding='utf-8')
+    (docs / 'blog' / 'posts' / '2025' / 'other.md').write_text("# Other\n", encoding='utf-8')
+    changes = [('M', 'docs/tutorials.md'), ('A', 'docs/images/new.png'),
+               ('M', 'docs/blog/posts/2025/post.md'), ('M', 'README.md')]
+    plan = make_plan(changes, docs_dir=docs)
+    assert plan['mode'] == 'overlay'
+    assert plan['pages'] == ['tutorials.md', 'blog/posts/2025/post.md']
+    assert plan['static'] == ['images/new.png']
+    assert plan['blog'] and not plan['tags']
+    assert rebuild_set(plan, docs) == {'tutorials.md', 'blog/index.md', 'blog/posts/2025/post.md',
+                                       'blog/posts/2025/other.md'}
+
+    (docs / 'tutorials.md').write_text("---\ntags: [ansible]\n---\n# Tutorials\n", encoding='utf-8')
+    plan = make_plan(changes, docs_dir=docs)
+    assert plan['tags'] and 'tags.md' in rebuild_set(plan, docs)
+
+
+def test_overlay_needs_the_previous_preview(tmp_path, monkeypatch):
+    """Only a preview directory with a page manifest on the pages branch can be overlaid."""
+    def git(*args):
+        subprocess.run(["git", "-C", str(tmp_path), *args], check=True, capture_output=True)
+
+    git("init", "-q")
+    (tmp_path / 'pr-1').mkdir()
+    (tmp_path / 'pr-1' / 'page-manifest.json').write_text("{}", encoding='utf-8')
+    git("add", "pr-1")
+    git("-c", "user.name=test", "-c", "user.email=test@example.com", "commit", "-qm", "preview")
+    monkeypatch.chdir(tmp_path)
+    assert preview_exists("HEAD", "pr-1")
+    assert not preview_exists("HEAD", "pr-2")
+    assert not preview_exists("origin/gh-pages", "pr-1")
+
+
+def test_skip_when_no_site_content_changed():
+    """Changes outside docs/ need no preview build at all."""
+    plan = make_plan([('M', 'README.md'), ('M', '.github/scripts/announce_queue.py')])
+    assert plan['mode'] == 'skip' and plan['reason'] == "no site content changed"
+
+
+def test_reverted_files_are_rebuilt():
+    """A file reverted since the previous push is rebuilt; deletions win."""
+    since_base = [('M', 'docs/a.md')]
+    since_previous = [('M', 'docs/b.md'), ('D', 'docs/a.md')]
+    assert merge_changes(since_base, since_previous) == [('D', 'docs/a.md'), ('M', 'docs/b.md')]
+    plan = make_plan(merge_changes([], [('M', 'docs/reverted.md')]))
+    assert plan['mode'] == 'overlay' and plan['pages'] == ['reverted.md']
+
+
+def test_stub_keeps_front_matter_and_title(tmp_path):
+    """Stubs keep what navigation and tags need, nothing else."""
+    page = tmp_path / 'page.md'
+    page.write_text("---\ntags: [ansible]\n---\nIntro\n\n# Title\n\nBody text\n", encoding='utf-8')
+    assert stub_markdown(page) == "---\ntags: [ansible]\n---\n# Title\n"
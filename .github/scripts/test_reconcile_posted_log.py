@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for posted-log reconciliation, against a local fake feed server.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from atproto import Client
+
+from reconcile_posted_log import (author_feed_fetcher, build_url_index, load_feed_cache, match_feed, reconcile,
+                                  save_feed_cache, sync_feed)
+
+ACTOR = "netdevops.bsky.social"
+DID = "did:plc:netdevops"
+PAGE_SIZE = 2
+
+
+def feed_post(n, url, reposted=False):
+    """A feed view item announcing url, as getAuthorFeed returns it."""
+    text = f"New blog post online!: Post {n}\n\n{url}"
+    start = len(text.encode()) - len(url.encode())
+    view = {"post": {
+        "uri": f"at://{DID}/app.bsky.feed.post/{n}", "cid": "bafypost",
+        "author": {"did": "did:plc:other" if reposted else DID, "handle": ACTOR},
+        "record": {"$type": "app.bsky.feed.post", "text": text, "createdAt": f"2025-01-{n:02d}T10:00:00.000Z",
+                   "facets": [{"index": {"byteStart": start, "byteEnd": start + len(url.encode())},
+                               "features": [{"$type": "app.bsky.richtext.facet#link", "uri": url}]}]},
+        "indexedAt": f"2025-01-{n:02d}T10:00:01.000Z",
+    }}
+    if reposted:
+        view["reason"] = {"$type": "app.bsky.feed.defs#reasonRepost",
+                          "by": {"did": DID, "handle": ACTOR}, "indexedAt": "2025-01-20T00:00:00.000Z"}
+    return view
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    """Serves app.bsky.feed.getAuthorFeed from server.feed (newest first) with numeric cursors."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path != "/xrpc/app.bsky.feed.getAuthorFeed":
+            self.send_response(404)
+            self.end_headers()
+            return
+        query = parse_qs(parts.query)
+        offset = int(query.get("cursor", ["0"])[0])
+        self.server.requests.append(offset)
+        page = self.server.feed[offset:offset + PAGE_SIZE]
+        body = {"feed": page}
+        if offset + PAGE_SIZE < len(self.server.feed):
+            body["cursor"] = str(offset + PAGE_SIZE)
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_feed_server(feed):
+    """Start the fake feed server on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FeedHandler)
+    server.feed, server.requests = feed, []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, author_feed_fetcher(Client(base_url=f"http://127.0.0.1:{server.server_address[1]}/xrpc"), ACTOR)
+
+
+def test_cursor_cache_fetches_only_new_posts():
+    """A limited first run resumes later; a new post costs one page."""
+    feed = [feed_post(n, f"https://netdevops.it/blog/post-{n}/") for n in range(5, 0, -1)]
+    feed.insert(1, feed_post(9, "https://netdevops.it/blog/someone-else/", reposted=True))
+    server, fetch_page = start_feed_server(feed)
+    try:
+        cache = load_feed_cache("/nonexistent/feed.json", ACTOR)
+        assert sync_feed(fetch_page, cache, max_pages=2) == (3, 2)
+        assert not cache["complete"] and cache["cursor"] == "4"
+
+        assert sync_feed(fetch_page, cache) == (2, 2)  # top page, then the rest of the history
+        assert cache["complete"] and len(cache["items"]) == 5
+
+        feed.insert(0, feed_post(6, "http://NetDevOps.it/blog/post-6"))
+        server.requests.clear()
+        assert sync_feed(fetch_page, cache) == (1, 1)
+        assert server.requests == [0]
+    finally:
+        server.shutdown()
+
+
+
+def test_rebuild_refetches_the_feed(tmp_path):
+    """A refresh ignores the cached items, so posts deleted from the feed are forgotten."""
+    feed = [feed_post(n, f"https://netdevops.it/blog/post-{n}/") for n in range(3, 0, -1)]
+    server, fetch_page = start_feed_server(feed)
+    try:
+        cache_file = tmp_path / "feed.json"
+        cache = load_feed_cache(cache_file, ACTOR)
+        sync_feed(fetch_page, cache)
+        save_feed_cache(cache, cache_file)
+
+        del feed[1]
+        assert len(load_feed_cache(cache_file, ACTOR)["items"]) == 3
+        cache = load_feed_cache(cache_file, ACTOR, refresh=True)
+        assert sync_feed(fetch_page, cache) == (2, 1)
+        assert cache["complete"] and len(cache["items"]) == 2
+    finally:
+        server.shutdown()
+
+def test_reconcile_repairs_log_in_bulk():
+    """Feed posts are matched by URL; the log is added to, repaired and pruned."""
+    items = [
+        {"uri": "at://a/1", "created_at": "2025-01-01T10:00:00Z", "urls": ["https://netdevops.it/blog/post-1/"]},
+        {"uri": "at://a/2", "created_at": "2025-01-02T10:00:00Z", "urls": ["https://netdevops.it/blog/old-slug"]},
+        {"uri": "at://a/3", "created_at": "2025-01-03T10:00:00Z", "urls": ["https://netdevops.it/blog/post-1/"]},
+        {"uri": "at://a/4", "created_at": "2025-01-04T10:00:00Z", "urls": ["https://netdevops.it/blog/gone/"]},
+    ]
+    posts = [{"post_id": "p1.md", "title": "Post 1", "url": "https://netdevops.it/blog/post-1/"},
+             {"post_id": "p2.md", "title": "Post 2", "url": "https://netdevops.it/blog/post-2/"},
+             {"post_id": "p3.md", "title": "Post 3", "url": "https://netdevops.it/blog/post-3/"}]
+    posted_log = {
+        "p2.md": {"posted_at": "2025-01-02T10:00:00Z", "title": "Post 2", "url": "https://netdevops.it/blog/old-slug/"},
+        "p3.md": {"posted_at": "2025-01-05T10:00:00Z", "title": "Post 3", "url": "https://netdevops.it/blog/post-3/"},
+    }
+    matches, unmatched = match_feed(items, build_url_index(posts, posted_log))
+    assert matches["p1.md"]["uri"] == "at://a/1"  # the earliest announcement wins
+    assert [item["uri"] for item in unmatched] == ["at://a/4"]
+
+    summary = reconcile(posted_log, posts, matches, rebuild=True)
+    assert summary["added"] == ["p1.md"] and summary["repaired"] == ["p2.md"]
+    assert summary["missing_in_feed"] == ["p3.md"] and summary["removed"] == ["p3.md"]
+    assert posted_log["p1.md"]["targets"]["bluesky"]["uri"] == "at://a/1"
+    assert posted_log["p2.md"]["url"] == "https://netdevops.it/blog/post-2/"
+    assert "p3.md" not in posted_log
+
+    # Reconciling again changes nothing
+    summary = reconcile(posted_log, posts, matches, rebuild=True)
+    assert not summary["added"] and not summary["repaired"] and not summary["removed"]
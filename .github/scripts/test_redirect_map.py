@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test script for the redirect map of moved pages.
+"""
+
+import tempfile
+from pathlib import Path
+
+from redirect_map import find_moves, update_redirects, write_stubs
+
+
+def page(src, url, content_hash, generated=False):
+    """A page entry as written by hooks/page_manifest.py."""
+    return {'src': src, 'url': url, 'dest': url + 'index.html', 'title': src, 'hash': content_hash,
+            'generated': generated}
+
+
+def test_moves_are_matched_by_source_then_hash():
+    """Slug changes match by source file, renamed files by unique content hash."""
+    previous = [page('blog/posts/a.md', 'blog/old-title/', 'h1'),
+                page('blog/posts/b.md', 'blog/b/', 'h2'),
+                page('blog/posts/c.md', 'blog/c/', 'h3'),
+                page('blog/posts/gone.md', 'blog/gone/', 'h4'),
+                page('blog/archive/2024.md', 'blog/archive/2024/', 'h5', generated=True)]
+    pages = [page('blog/posts/a.md', 'blog/new-title/', 'h1-edited'),
+             page('blog/posts/b.md', 'blog/b/', 'h2'),
+             page('blog/posts/renamed-c.md', 'blog/renamed-c/', 'h3')]
+    assert find_moves(previous, pages) == {'blog/old-title/': 'blog/new-title/', 'blog/c/': 'blog/renamed-c/'}
+
+
+def test_redirects_are_carried_forward_without_chains():
+    """A page moving twice keeps a single hop; revived or dead URLs are dropped."""
+    redirects = {'blog/first/': 'blog/second/', 'blog/revived/': 'blog/x/', 'blog/dead/': 'blog/removed/'}
+    urls = {'blog/third/', 'blog/revived/', 'blog/x/'}
+    dropped = update_redirects(redirects, {'blog/second/': 'blog/third/'}, urls)
+    assert redirects == {'blog/first/': 'blog/third/', 'blog/second/': 'blog/third/'}
+    assert sorted(dropped) == ['blog/dead/', 'blog/revived/']
+
+
+def test_stubs_never_overwrite_real_pages():
+    """Stubs point at the absolute new URL and leave existing files alone."""
+    with tempfile.TemporaryDirectory() as tmp:
+        Path(tmp, 'blog', 'taken').mkdir(parents=True)
+        Path(tmp, 'blog', 'taken', 'index.html').write_text('real page')
+        redirects = {'blog/old/': 'blog/new/', 'blog/taken/': 'blog/new/'}
+        assert write_stubs(tmp, redirects, 'https://netdevops.it/') == (1, 1)
+        stub = Path(tmp, 'blog', 'old', 'index.html').read_text()
+        assert 'url=https://netdevops.it/blog/new/' in stub
+        assert Path(tmp, 'blog', 'taken', 'index.html').read_text() == 'real page'
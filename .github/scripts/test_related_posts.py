@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the related posts hook.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "hooks"))
+
+from related_posts import cache_dir_for, load_cache, save_cache, tokenize, top_related, update_counts
+
+POSTS = [
+    ("blog/posts/ansible.md", "---\ntitle: Ansible roles\ntags: [ansible]\n---\nInstall nautobot with ansible roles\n"),
+    ("blog/posts/nautobot.md", "# Nautobot jobs\n\nWrite nautobot jobs and install nautobot\n"),
+    ("blog/posts/vmware.md", "# VMware shared folder\n\nMount a shared folder in ubuntu\n"),
+]
+
+
+def test_tokenize_drops_code_links_and_stop_words():
+    """Titles and tags are boosted; code, link targets and stop words are ignored."""
+    title, terms = tokenize("---\ntitle: Nautobot jobs\ntags: [python]\n---\n"
+                            "Read [the docs](https://example.com/ignored) about jobs\n\n```\nsecret_code\n```\n")
+    assert title == "Nautobot jobs"
+    assert "ignored" not in terms and "secret_code" not in terms and "about" not in terms
+    assert terms.count("jobs") == 4 and terms.count("python") == 3 and terms.count("docs") == 1
+
+
+def test_update_counts_reuses_the_cache_and_compacts_the_vocabulary():
+    """Unchanged posts are taken from the cache; unused terms are dropped."""
+    docs, vocabulary, counts, retokenised = update_counts(POSTS, [], [], None)
+    assert retokenised == 3 and counts.shape == (3, len(vocabulary))
+
+    changed = POSTS[:2] + [("blog/posts/vmware.md", "# VMware\n\nNothing else\n")]
+    docs, new_vocabulary, new_counts, retokenised = update_counts(changed, docs, vocabulary, counts)
+    assert retokenised == 1
+    assert "ubuntu" in vocabulary and "ubuntu" not in new_vocabulary
+    assert new_counts.shape == (3, len(new_vocabulary))
+    row = new_counts[1].toarray().ravel()
+    assert row[new_vocabulary.index("nautobot")] == counts[1].toarray().ravel()[vocabulary.index("nautobot")]
+
+
+def test_top_related_ranks_by_similarity():
+    """Posts sharing terms are related, unrelated posts are left out."""
+    docs, vocabulary, counts, _ = update_counts(POSTS, [], [], None)
+    related = top_related(counts, k=2, min_similarity=0.05)
+    assert [row for row, _ in related[0]] == [1]
+    assert [row for row, _ in related[1]] == [0]
+    assert related[2] == []
+
+
+def test_cache_is_kept_per_docs_dir(tmp_path):
+    """A preview build of staged docs does not share the cache of the real docs."""
+    assert cache_dir_for("docs") != cache_dir_for(".cache/preview/docs")
+    docs, vocabulary, counts, _ = update_counts(POSTS, [], [], None)
+    save_cache(docs, vocabulary, counts, tmp_path)
+    cached_docs, cached_vocabulary, cached_counts = load_cache(tmp_path)
+    assert cached_docs == docs and cached_vocabulary == vocabulary
+    assert (cached_counts != counts).nnz == 0
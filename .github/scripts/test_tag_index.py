@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the tag index hook.
+"""
+
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "hooks"))
+
+import tag_index
+from tag_index import build_index
+
+
+def make_page(src, url, **meta):
+    """A rendered page as the hook sees it."""
+    return SimpleNamespace(file=SimpleNamespace(src_uri=src), url=url, title=meta.get("title"), meta=meta)
+
+
+def test_index_is_newest_first_with_sorted_postings():
+    """Post IDs follow the date, newest first, so every postings list is sorted."""
+    entries = {
+        "a.md": {"url": "blog/a/", "title": "A", "date": "2024-01-01", "summary": "",
+                 "tags": ["ansible", "docker"], "categories": []},
+        "b.md": {"url": "blog/b/", "title": "B", "date": "2025-06-01", "summary": "",
+                 "tags": ["Ansible"], "categories": ["Automation"]},
+        "c.md": {"url": "blog/c/", "title": "C", "date": "2025-01-01", "summary": "",
+                 "tags": ["docker"], "categories": []},
+    }
+    index = build_index(entries)
+    assert [post[0] for post in index["posts"]] == ["blog/b/", "blog/c/", "blog/a/"]
+    assert index["tags"] == {"ansible": [2], "Ansible": [0], "docker": [1, 2]}
+    assert index["categories"] == {"Automation": [0]}
+
+
+def test_pages_are_indexed_and_widgets_get_the_script():
+    """Tagged pages are indexed; only pages with a widget load the script."""
+    tag_index._entries.clear()
+    post = make_page("blog/posts/x.md", "blog/x/", title="X", date=date(2025, 3, 1), tags="nautobot",
+                     summary="word " * 50)
+    html = tag_index.on_page_content("<p>Post</p>", post, None, None)
+    assert html == "<p>Post</p>"
+    entry = tag_index._entries["blog/posts/x.md"]
+    assert entry["date"] == "2025-03-01" and entry["tags"] == ["nautobot"]
+    assert len(entry["summary"]) <= tag_index.SUMMARY_LENGTH + 1 and entry["summary"].endswith("…")
+
+    tags_page = make_page("tags.md", "tags/")
+    html = tag_index.on_page_content('<div data-tag-list="nautobot"></div>', tags_page, None, None)
+    assert html.endswith('<script src="../js/tag-index.js" defer></script>\n')
+    home = tag_index.on_page_content('<div data-category-list="Automation"></div>', make_page("index.md", ""),
+                                     None, None)
+    assert '<script src="js/tag-index.js" defer>' in home
+    assert "tags.md" not in tag_index._entries
+
+
+def test_index_file_is_only_rewritten_when_changed(tmp_path):
+    """An unchanged index keeps the existing file and its timestamp."""
+    tag_index._entries.clear()
+    tag_index.on_page_content("", make_page("blog/posts/x.md", "blog/x/", tags=["docker"]), None, None)
+    config = SimpleNamespace(site_dir=str(tmp_path))
+    tag_index.on_post_build(config)
+    index_file = tmp_path / tag_index.INDEX_FILE
+    assert json.loads(index_file.read_text(encoding="utf-8"))["tags"] == {"docker": [0]}
+
+    os.utime(index_file, (0, 0))
+    tag_index.on_post_build(config)
+    assert index_file.stat().st_mtime == 0
+
+    tag_index.on_page_content("", make_page("blog/posts/y.md", "blog/y/", tags=["docker"]), None, None)
+    tag_index.on_post_build(config)
+    assert index_file.stat().st_mtime != 0
@@ -3,12 +3,20 @@
 Check all URLs in posted_to_bluesky.json and compare with current script output.
 """
 
+import argparse
 import json
 import re
+import sys
 from pathlib import Path
 
+# Shared instrumentation lives with the other automation scripts
+sys.path.insert(0, str(Path(__file__).resolve().parent / ".github" / "scripts"))
+import instrumentation
+from instrumentation import count, timed
+
 SITE_URL = "https://netdevops.it"
 
+@timed("slug")
 def get_post_url(file_path, front_matter=None):
     """Generate the URL for a blog post."""
     # If we have front matter with a title, use that to generate the URL
@@ -70,10 +78,13 @@ def get_post_url(file_path, front_matter=None):
         url = url.replace('https:/', 'https://', 1)
     return url
 
+@timed("parse")
 def load_posted_log():
     """Load the log of posts that have already been posted to Bluesky."""
     log_file = Path(".github/scripts/posted_to_bluesky.json")
     if log_file.exists():
+        count("files_read")
+        count("bytes_read", log_file.stat().st_size)
         with open(log_file, 'r') as f:
             return json.load(f)
     return {}
@@ -126,5 +137,9 @@ def main():
             print()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    with instrumentation.instrumented("check_urls", args):
+        main()
 
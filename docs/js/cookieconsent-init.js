@@ -1,4 +1,4 @@
-window.addEventListener("load", function(){
+function initCookieConsent() {
     window.cookieconsent.initialise({
       palette: {
         popup: { background: "#263238" },
@@ -13,5 +13,10 @@ window.addEventListener("load", function(){
         href: "/privacy/"
       }
     });
-  });
-  
\ No newline at end of file
+  }
+  // The post-build optimiser may load this script after the load event
+  if (document.readyState === "complete") {
+    initCookieConsent();
+  } else {
+    window.addEventListener("load", initCookieConsent);
+  }
\ No newline at end of file
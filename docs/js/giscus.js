@@ -20,6 +20,17 @@ document.addEventListener("DOMContentLoaded", function () {
     script.setAttribute("crossorigin", "anonymous");
     script.async = true;
   
-    container.appendChild(script);
+    // Only fetch the giscus client when the comments are about to scroll into view
+    if (!("IntersectionObserver" in window)) {
+      container.appendChild(script);
+      return;
+    }
+    const observer = new IntersectionObserver(function (entries) {
+      if (entries.some(function (entry) { return entry.isIntersecting; })) {
+        observer.disconnect();
+        container.appendChild(script);
+      }
+    }, { rootMargin: "400px 0px" });
+    observer.observe(container);
   });
   
\ No newline at end of file
@@ -0,0 +1,265 @@
+(function () {
+  /* Lazy, sharded search. The index is prebuilt by
+     .github/scripts/build_search_shards.py into search/shards/. Only the small
+     manifest, the term shards a query touches and the document chunks of the
+     displayed results are downloaded. */
+  const MAX_RESULTS = 10;
+
+  const configEl = document.getElementById('__config');
+  const config = configEl ? JSON.parse(configEl.textContent) : {};
+  const base = new URL((config.base || '.') + '/', location.href);
+  const shardsUrl = new URL('search/shards/', base);
+
+  const cache = new Map();
+  let manifestPromise = null;
+  let querySeq = 0;
+
+  /* ---------- Loading ---------- */
+  function fetchJson(path) {
+    if (!cache.has(path)) {
+      cache.set(path, fetch(new URL(path, shardsUrl)).then(r => (r.ok ? r.json() : null)));
+    }
+    return cache.get(path);
+  }
+
+  function loadManifest() {
+    if (!manifestPromise) {
+      manifestPromise = fetchJson('manifest.json').then(manifest => {
+        if (!manifest) return null;
+        manifest.separatorRe = new RegExp(manifest.separator, 'u');
+        manifest.stopwordSet = new Set(manifest.stopwords);
+        manifest.shardSet = new Set(manifest.shards);
+        return manifest;
+      });
+    }
+    return manifestPromise;
+  }
+
+  function fileName(key) {
+    return key.replace(/[^A-Za-z0-9_-]/gu, c => '~' + c.codePointAt(0).toString(16)) + '.json';
+  }
+
+  /* ---------- Query ---------- */
+  function tokenize(manifest, text) {
+    const terms = [];
+    text.toLowerCase().split(manifest.separatorRe).forEach(chunk => {
+      chunk.split(/[^\p{L}\p{N}_]+/u).forEach(term => {
+        if (term.length >= manifest.prefix && !manifest.stopwordSet.has(term)) terms.push(term);
+      });
+    });
+    return terms;
+  }
+
+  /* A light English stemmer so "roles" also finds "role" and "configuring"
+     finds "configure"; lunr stemmed its index, the shards keep whole words.
+     Stems keep at least three characters, so they stay in the term's shard. */
+  function stem(term) {
+    for (const suffix of ['ies', 'ing', 'es', 'ed', 's']) {
+      if (term.length - suffix.length >= 3 && term.endsWith(suffix)) {
+        term = suffix === 'ies' ? term.slice(0, -3) + 'y' : term.slice(0, -suffix.length);
+        break;
+      }
+    }
+    return term.length > 3 && term.endsWith('e') ? term.slice(0, -1) : term;
+  }
+
+  function chunkFor(manifest, docId) {
+    let lo = 0;
+    let hi = manifest.chunks.length - 1;
+    while (lo < hi) {
+      const mid = (lo + hi + 1) >> 1;
+      if (manifest.chunks[mid][1] <= docId) lo = mid; else hi = mid - 1;
+    }
+    return manifest.chunks[lo];
+  }
+
+  async function search(query) {
+    const manifest = await loadManifest();
+    if (!manifest) return null;
+    const terms = tokenize(manifest, query);
+    if (!terms.length) return [];
+
+    const shards = await Promise.all(terms.map(term => {
+      const key = term.slice(0, manifest.prefix);
+      return manifest.shardSet.has(key) ? fetchJson('terms/' + fileName(key)) : null;
+    }));
+
+    // Every term must match, exactly, by its stem or as a prefix
+    let scores = null;
+    terms.forEach((term, i) => {
+      const shard = shards[i] || {};
+      const termStem = stem(term);
+      const matches = new Map();
+      Object.keys(shard).forEach(candidate => {
+        let boost = 0;
+        if (candidate === term) boost = 1;
+        else if (stem(candidate) === termStem) boost = 0.75;
+        else if (candidate.startsWith(term)) boost = 0.5;
+        if (boost) {
+          const postings = shard[candidate];
+          for (let p = 0; p < postings.length; p += 2) {
+            matches.set(postings[p], (matches.get(postings[p]) || 0) + postings[p + 1] * boost);
+          }
+        }
+      });
+      if (scores === null) {
+        scores = matches;
+      } else {
+        const next = new Map();
+        scores.forEach((score, docId) => {
+          if (matches.has(docId)) next.set(docId, score + matches.get(docId));
+        });
+        scores = next;
+      }
+    });
+
+    const ranked = [...scores.entries()].sort((a, b) => b[1] - a[1]);
+    const top = ranked.slice(0, MAX_RESULTS);
+    const chunks = await Promise.all(top.map(([docId]) => {
+      const chunk = chunkFor(manifest, docId);
+      return fetchJson('docs/' + fileName(chunk[0])).then(docs => ({ docs, offset: docId - chunk[1] }));
+    }));
+
+    return {
+      total: ranked.length,
+      results: chunks.map(({ docs, offset }) => (docs ? docs[offset] : null)).filter(Boolean),
+    };
+  }
+
+  /* ---------- Rendering ---------- */
+  /* Material's search worker still runs against the stubbed, empty
+     search_index.json and would answer every query with "No matching
+     documents". Once the shards are available its result element is hidden
+     and results go into a container of our own, so the two never race. */
+  let output = null;
+
+  function escapeHtml(s) {
+    return s.replace(/[&<>"']/g, c => ({
+      '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    }[c]));
+  }
+
+  function translate(key, count) {
+    const text = (config.translations || {})[key] || '';
+    return text.replace('#', count);
+  }
+
+  function takeOver() {
+    if (output) return output;
+    const builtin = document.querySelector('[data-md-component="search-result"]');
+    if (!builtin) return null;
+    const style = document.createElement('style');
+    style.textContent = '[data-md-component="search-result"]{display:none}';
+    document.head.appendChild(style);
+    output = document.createElement('div');
+    output.className = 'md-search-result';
+    output.innerHTML = '<div class="md-search-result__meta"></div>' +
+      '<ol class="md-search-result__list" role="presentation"></ol>';
+    builtin.after(output);
+    return output;
+  }
+
+  function clear() {
+    if (!output) return;
+    output.querySelector('.md-search-result__meta').textContent = translate('search.result.placeholder');
+    output.querySelector('.md-search-result__list').innerHTML = '';
+  }
+
+  function href(loc, query) {
+    // Same ?h= parameter Material adds, for search.highlight on the target page
+    const url = new URL(loc, base);
+    url.searchParams.set('h', query);
+    return url.href;
+  }
+
+  function article(loc, title, teaser, query, heading) {
+    return `
+        <a href="${escapeHtml(href(loc, query))}" class="md-search-result__link" tabindex="-1">
+          <article class="md-search-result__article${heading === 'h1' ? ' md-search-result__article--document' : ''} md-typeset">
+            ${heading === 'h1' ? '<div class="md-search-result__icon md-icon"></div>' : ''}
+            <${heading}>${escapeHtml(title)}</${heading}>
+            <p>${escapeHtml(teaser)}</p>
+          </article>
+        </a>`;
+  }
+
+  function render(found, query) {
+    if (!takeOver()) return;
+    const meta = output.querySelector('.md-search-result__meta');
+    const list = output.querySelector('.md-search-result__list');
+
+    if (!found.total) {
+      meta.textContent = translate('search.result.none');
+      list.innerHTML = '';
+      return;
+    }
+    meta.textContent = found.total === 1
+      ? translate('search.result.one')
+      : translate('search.result.other', found.total);
+
+    // Group sections under their page, in order of the best match of each page
+    const pages = new Map();
+    found.results.forEach(doc => {
+      const page = doc[0].split('#', 1)[0];
+      if (!pages.has(page)) pages.set(page, []);
+      pages.get(page).push(doc);
+    });
+    list.innerHTML = [...pages.values()].map(docs => `
+      <li class="md-search-result__item">${docs.map(([loc, title, teaser], i) =>
+        article(loc, title, teaser, query, i === 0 ? 'h1' : 'h2')).join('')}
+      </li>`).join('');
+  }
+
+  /* ---------- Wiring ---------- */
+  let timer = null;
+
+  function run(query, delay) {
+    const seq = ++querySeq;
+    clearTimeout(timer);
+    if (!query) {
+      clear();
+      return;
+    }
+    timer = setTimeout(() => {
+      search(query).then(found => {
+        if (found && seq === querySeq) render(found, query);
+      });
+    }, delay);
+  }
+
+  document.addEventListener('input', event => {
+    if (!event.target.matches('[data-md-component="search-query"]')) return;
+    run(event.target.value.trim(), 100);
+  });
+
+  // search.share links carry the query in ?q=; Material fills in the field
+  // and opens the search without an input event, so run the query here
+  const shared = new URLSearchParams(location.search).get('q');
+  if (shared && shared.trim()) {
+    loadManifest().then(manifest => {
+      if (manifest && takeOver()) run(shared.trim(), 0);
+    });
+  }
+
+  // Enter opens the first result, as in Material's own result list
+  document.addEventListener('keydown', event => {
+    if (!output || event.key !== 'Enter' || !event.target.matches('[data-md-component="search-query"]')) return;
+    const first = output.querySelector('.md-search-result__link');
+    if (first) {
+      event.preventDefault();
+      event.stopImmediatePropagation();
+      location.href = first.href;
+    }
+  }, true);
+
+  // Fetch the manifest as soon as the visitor shows intent to search; without
+  // shards (a plain mkdocs serve) Material's own search stays in charge
+  document.addEventListener('focusin', event => {
+    if (!event.target.matches('[data-md-component="search-query"]')) return;
+    loadManifest().then(manifest => {
+      if (manifest) takeOver();
+    });
+  });
+
+  window.shardedSearch = { search };
+})();
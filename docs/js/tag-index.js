@@ -0,0 +1,89 @@
+(function () {
+  /* Tag listings from the compact inverted index that hooks/tag_index.py
+     writes to tag-index.json. Post IDs are ordered newest first and every
+     postings list is sorted, so "latest in tag" is a slice and an
+     intersection is a linear merge.
+
+     Markup:
+       <div data-tag-list="nautobot" data-limit="5"></div>
+       <div data-tag-list="ansible,cisco"></div>   (posts with all tags)
+       <div data-category-list="Automation"></div> */
+  const configEl = document.getElementById('__config');
+  const config = configEl ? JSON.parse(configEl.textContent) : {};
+  const base = new URL((config.base || '.') + '/', location.href);
+
+  let indexPromise = null;
+
+  function load() {
+    if (!indexPromise) {
+      indexPromise = fetch(new URL('tag-index.json', base))
+        .then(r => (r.ok ? r.json() : null))
+        .catch(() => null);
+    }
+    return indexPromise;
+  }
+
+  function findKey(postings, name) {
+    if (name in postings) return name;
+    const lower = name.toLowerCase();
+    return Object.keys(postings).find(key => key.toLowerCase() === lower);
+  }
+
+  function intersect(a, b) {
+    const out = [];
+    let i = 0;
+    let j = 0;
+    while (i < a.length && j < b.length) {
+      if (a[i] === b[j]) {
+        out.push(a[i]);
+        i++;
+        j++;
+      } else if (a[i] < b[j]) {
+        i++;
+      } else {
+        j++;
+      }
+    }
+    return out;
+  }
+
+  /* Post IDs carrying every one of names, newest first */
+  function lookup(index, field, names) {
+    const lists = names.map(name => index[field][findKey(index[field], name)] || []);
+    lists.sort((a, b) => a.length - b.length);
+    return lists.reduce((acc, list) => intersect(acc, list));
+  }
+
+  function query(names, { field = 'tags', limit } = {}) {
+    return load().then(index => {
+      if (!index || !names.length) return [];
+      const ids = lookup(index, field, names);
+      return (limit ? ids.slice(0, limit) : ids).map(id => {
+        const [url, title, date, summary] = index.posts[id];
+        return { url: new URL(url, base).href, title, date, summary };
+      });
+    });
+  }
+
+  function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, c => ({
+      '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;',
+    })[c]);
+  }
+
+  function render(el, field, value) {
+    const names = value.split(',').map(name => name.trim()).filter(Boolean);
+    const limit = parseInt(el.dataset.limit, 10) || undefined;
+    query(names, { field, limit }).then(posts => {
+      el.innerHTML = posts.length
+        ? '<ul>' + posts.map(post => `<li><a href="${escapeHtml(post.url)}">${escapeHtml(post.title)}</a>` +
+            (post.date ? ` <small>${escapeHtml(post.date)}</small>` : '') + '</li>').join('') + '</ul>'
+        : '';
+    });
+  }
+
+  document.querySelectorAll('[data-tag-list]').forEach(el => render(el, 'tags', el.dataset.tagList));
+  document.querySelectorAll('[data-category-list]').forEach(el => render(el, 'categories', el.dataset.categoryList));
+
+  window.tagIndex = { load, query };
+})();
@@ -14,48 +14,155 @@ Usage:
   export NAUTOBOT_TOKEN=yourtoken
   export NAUTOBOT_SITE=ams-dc1
   python3 nautobot_to_pyats_testbed.py > testbed.yml
+
+Add --topology to also export a pyATS topology section with the cabled
+interfaces. Devices, interfaces and cables are fetched in bulk for the whole
+site/location, with the pages of each list requested concurrently, and joined
+in memory, so the number of API calls does not grow with the device count.
+
+With --output the testbed is written to a file instead, and only when a
+device (or its topology) actually changed; the file is replaced atomically.
+--changes writes the added, removed and changed device names as JSON, so
+later jobs can re-test only those devices:
+
+  python3 nautobot_to_pyats_testbed.py --output testbed.yml --changes changes.json
+
+When run from the repository, --metrics-file and --profile record where the
+export spent its time (see .github/scripts/instrumentation.py).
 """
+import argparse
+import hashlib
+import json
 import os
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
 import requests
 import yaml
 
+# Stage timers and counters are optional, a downloaded copy runs without them
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent.parent / ".github" / "scripts"
+if (SCRIPTS_DIR / "instrumentation.py").is_file():
+    sys.path.insert(0, str(SCRIPTS_DIR))
+try:
+    import instrumentation
+    from instrumentation import count, stage
+except ImportError:
+    instrumentation = None
+
+    def stage(name):
+        return nullcontext()
+
+    def count(name, value=1):
+        pass
+
 NAUTOBOT_URL = os.environ.get("NAUTOBOT_URL")
 NAUTOBOT_TOKEN = os.environ.get("NAUTOBOT_TOKEN")
 NAUTOBOT_SITE = os.environ.get("NAUTOBOT_SITE")
 
-if not (NAUTOBOT_URL and NAUTOBOT_TOKEN and NAUTOBOT_SITE):
-    print("Error: Please set NAUTOBOT_URL, NAUTOBOT_TOKEN, and NAUTOBOT_SITE environment variables.", file=sys.stderr)
-    sys.exit(1)
-
 HEADERS = {
     "Authorization": f"Token {NAUTOBOT_TOKEN}",
     "Accept": "application/json",
 }
+# The C loader and dumper are much faster on large testbeds when libyaml is available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+# Nautobot's default MAX_PAGE_SIZE; a server may return smaller pages
+PAGE_SIZE = 1000
+# Requests in flight at once, all from one pool so the connection pool never overflows
+WORKERS = 8
+
+session = requests.Session()
+session.headers.update(HEADERS)
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=WORKERS))
+session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=WORKERS))
+
+def api_get(url, params=None):
+    with stage("http_fetch"):
+        resp = session.get(url, params=params)
+        count("http_calls")
+        count("bytes_read", len(resp.content))
+        resp.raise_for_status()
+        return resp.json()
+
+def list_url(endpoint):
+    return f"{NAUTOBOT_URL.rstrip('/')}/{endpoint}/"
+
+def follow_next(first):
+    """Return all results by following the next links from the first page."""
+    results = list(first.get("results", []))
+    next_url = first.get("next")
+    while next_url:
+        page = api_get(next_url)
+        results.extend(page.get("results", []))
+        next_url = page.get("next")
+    return results
+
+def api_get_lists(endpoints, params, pool):
+    """Return all results of several list endpoints, in the order given.
+
+    The first pages tell the total count and the page size the server
+    actually returns; the remaining pages of every list are then requested
+    concurrently by offset through the one pool. When a count is missing the
+    next links are followed instead; when the rows do not add up to it (the
+    list changed while it was paged), the list is read again that way.
+    """
+    firsts = [(endpoint, pool.submit(api_get, list_url(endpoint), {**params, "limit": PAGE_SIZE, "offset": 0}))
+              for endpoint in endpoints]
+    pending = []
+    for endpoint, future in firsts:
+        first = future.result()
+        total, page_size = first.get("count"), len(first.get("results", []))
+        if total is None or not page_size or not first.get("next"):
+            pending.append((endpoint, first, None))
+            continue
+        pending.append((endpoint, first, [
+            pool.submit(api_get, list_url(endpoint), {**params, "limit": page_size, "offset": offset})
+            for offset in range(page_size, total, page_size)
+        ]))
+
+    lists = []
+    for endpoint, first, pages in pending:
+        if pages is None:
+            lists.append(follow_next(first))
+            continue
+        results = list(first["results"])
+        for page in pages:
+            results.extend(page.result().get("results", []))
+        if len(results) != first["count"]:
+            results = follow_next(api_get(list_url(endpoint), {**params, "limit": PAGE_SIZE, "offset": 0}))
+        lists.append(results)
+    return lists
+
+def api_get_all(endpoint, params, pool):
+    """Return all results of a list endpoint."""
+    return api_get_lists([endpoint], params, pool)[0]
 
 def get_location_id(site_name):
     # For Nautobot 2.x: get location with type 'site'
     url = f"{NAUTOBOT_URL.rstrip('/')}/dcim/locations/?location_type=site&name={site_name}"
-    resp = requests.get(url, headers=HEADERS)
-    resp.raise_for_status()
-    results = resp.json().get("results", [])
+    results = api_get(url).get("results", [])
     if results:
         return results[0]["id"]
     return None
 
-def get_devices(site):
-    # Try Nautobot 2.x locations first
+def location_filter(site):
+    # Try Nautobot 2.x locations first, fall back to the Nautobot 1.x site field
     location_id = get_location_id(site)
     if location_id:
-        url = f"{NAUTOBOT_URL.rstrip('/')}/dcim/devices/?location_id={location_id}&limit=1000"
-        resp = requests.get(url, headers=HEADERS)
-        resp.raise_for_status()
-        return resp.json().get("results", [])
-    # Fallback to Nautobot 1.x site field
-    url = f"{NAUTOBOT_URL.rstrip('/')}/dcim/devices/?site={site}&limit=1000"
-    resp = requests.get(url, headers=HEADERS)
-    resp.raise_for_status()
-    return resp.json().get("results", [])
+        return {"location_id": location_id}
+    return {"site": site}
+
+def get_devices(site_filter, pool):
+    return api_get_all("dcim/devices", site_filter, pool)
+
+def get_interfaces_and_cables(site_filter, pool):
+    # Both lists are independent, their pages share the pool
+    interfaces, cables = api_get_lists(["dcim/interfaces", "dcim/cables"], site_filter, pool)
+    return interfaces, cables
 
 def get_primary_ip(device):
     ip = device.get("primary_ip4") or device.get("primary_ip")
@@ -89,10 +196,158 @@ def build_testbed(devices):
         }
     return testbed
 
+def interface_type(intf):
+    value = intf.get("type")
+    if isinstance(value, dict):  # {"value": ..., "label": ...}
+        value = value.get("value")
+    if value in ("virtual", "bridge"):
+        return "virtual"
+    if value == "lag":
+        return "lag"
+    return "ethernet"
+
+def build_topology(devices, interfaces, cables, testbed_devices):
+    """Return the pyATS topology section for the cabled interfaces.
+
+    Interfaces are indexed by id once, then every cable is resolved to its two
+    interface ends in a single pass. Only links between devices that are in
+    the testbed are kept.
+    """
+    device_names = {dev["id"]: dev["name"] for dev in devices}
+    interfaces_by_id = {}
+    for intf in interfaces:
+        name = device_names.get((intf.get("device") or {}).get("id"))
+        if name in testbed_devices:
+            interfaces_by_id[intf["id"]] = (name, intf)
+
+    topology = {}
+    for cable in cables:
+        a = interfaces_by_id.get(cable.get("termination_a_id"))
+        b = interfaces_by_id.get(cable.get("termination_b_id"))
+        if not (a and b):
+            continue  # circuits, front/console/power ports, or a device outside the testbed
+        link = cable.get("label") or f"{a[0]}_{a[1]['name']}--{b[0]}_{b[1]['name']}"
+        for device, intf in (a, b):
+            topology.setdefault(device, {"interfaces": {}})["interfaces"][intf["name"]] = {
+                "type": interface_type(intf),
+                "link": link,
+            }
+    return topology
+
+def canonical_hash(value):
+    data = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:16]
+
+def device_hashes(testbed):
+    """Hash every device entry together with its topology entry."""
+    topology = testbed.get("topology") or {}
+    return {name: canonical_hash({"device": entry, "topology": topology.get(name)})
+            for name, entry in (testbed.get("devices") or {}).items()}
+
+def other_sections(testbed):
+    return {key: value for key, value in testbed.items() if key not in ("devices", "topology")}
+
+def diff_testbeds(old, new):
+    """Return the change set between two testbeds."""
+    old_hashes, new_hashes = device_hashes(old), device_hashes(new)
+    return {
+        "added": sorted(set(new_hashes) - set(old_hashes)),
+        "removed": sorted(set(old_hashes) - set(new_hashes)),
+        "changed": sorted(name for name in set(old_hashes) & set(new_hashes) if old_hashes[name] != new_hashes[name]),
+        "unchanged": sum(1 for name, digest in new_hashes.items() if old_hashes.get(name) == digest),
+        "other_sections_changed": canonical_hash(other_sections(old)) != canonical_hash(other_sections(new)),
+        "hashes": dict(sorted(new_hashes.items())),
+    }
+
+def load_testbed(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            return yaml.load(f, Loader=YAML_LOADER) or {}
+        except yaml.YAMLError as e:
+            print(f"Warning: could not parse the previous testbed {path}, rewriting it: {e}", file=sys.stderr)
+            return {}
+
+def file_mode(path):
+    """Mode for path: the existing file's, or what a plain open() would create."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    mode = file_mode(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        # mkstemp creates the file readable by the owner only
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+def write_testbed(testbed, path, changes_path=None):
+    """Write the testbed to path if it changed and return the change set."""
+    # Sorted devices keep the file stable whatever order the API returns
+    for section in ("devices", "topology"):
+        if section in testbed:
+            testbed[section] = dict(sorted(testbed[section].items()))
+    changes = diff_testbeds(load_testbed(path), testbed)
+    changes["testbed"] = path
+    changes["written"] = bool(changes["added"] or changes["removed"] or changes["changed"]
+                              or changes["other_sections_changed"] or not os.path.exists(path))
+    if changes["written"]:
+        write_atomic(path, yaml.dump(testbed, Dumper=YAML_DUMPER, default_flow_style=False, sort_keys=False))
+    if changes_path:
+        write_atomic(changes_path, json.dumps(changes, indent=2) + "\n")
+    print(f"{path}: {len(changes['added'])} added, {len(changes['removed'])} removed, "
+          f"{len(changes['changed'])} changed, {changes['unchanged']} unchanged"
+          f"{'' if changes['written'] else ' (not rewritten)'}", file=sys.stderr)
+    return changes
+
+def main(args):
+    site_filter = location_filter(NAUTOBOT_SITE)
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        devices = get_devices(site_filter, pool)
+        if not devices:
+            print(f"No devices found for site/location '{NAUTOBOT_SITE}'.", file=sys.stderr)
+            sys.exit(1)
+        count("devices", len(devices))
+        with stage("build"):
+            testbed = build_testbed(devices)
+        if args.topology:
+            interfaces, cables = get_interfaces_and_cables(site_filter, pool)
+            count("interfaces", len(interfaces))
+            count("cables", len(cables))
+            with stage("build"):
+                testbed["topology"] = build_topology(devices, interfaces, cables, testbed["devices"])
+    with stage("write"):
+        if args.output:
+            write_testbed(testbed, args.output, args.changes)
+        else:
+            yaml.dump(testbed, sys.stdout, Dumper=YAML_DUMPER, default_flow_style=False, sort_keys=False)
+
 if __name__ == "__main__":
-    devices = get_devices(NAUTOBOT_SITE)
-    if not devices:
-        print(f"No devices found for site/location '{NAUTOBOT_SITE}'.", file=sys.stderr)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topology", action="store_true",
+                        help="Also export a topology section from the interfaces and cables")
+    parser.add_argument("--output", metavar="FILE",
+                        help="Write the testbed to FILE, only rewriting it when something changed")
+    parser.add_argument("--changes", metavar="FILE",
+                        help="With --output, write the added, removed and changed devices as JSON to FILE")
+    if instrumentation:
+        instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    if args.changes and not args.output:
+        parser.error("--changes requires --output")
+    if not (NAUTOBOT_URL and NAUTOBOT_TOKEN and NAUTOBOT_SITE):
+        print("Error: Please set NAUTOBOT_URL, NAUTOBOT_TOKEN, and NAUTOBOT_SITE environment variables.", file=sys.stderr)
         sys.exit(1)
-    testbed = build_testbed(devices)
-    yaml.dump(testbed, sys.stdout, default_flow_style=False, sort_keys=False) 
\ No newline at end of file
+    with instrumentation.instrumented("nautobot_to_pyats_testbed", args) if instrumentation else nullcontext():
+        main(args) 
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""
+MkDocs hook that adds OpenGraph meta tags to every page.
+Social networks (and the Bluesky publisher, which builds its link cards from
+the built site) read og:title, og:description and og:image. The description
+comes from the page's description or summary front matter and the image from
+the image front matter or the first local image in the content that exists.
+Image paths are resolved against the page's final URL and matched against the
+output paths of the site files, because the blog plugin moves posts away from
+their source directory.
+"""
+
+import html
+import re
+from urllib.parse import unquote, urljoin, urlsplit
+
+IMG_SRC_RE = re.compile(r'<img\b[^>]*\bsrc="([^"]+)"', re.IGNORECASE)
+
+_images = {}
+_dest_uris = set()
+
+
+def _absolute(url, page, config):
+    return urljoin(urljoin(config.site_url or "/", page.url), url)
+
+
+def on_pre_build(config):
+    _images.clear()
+    _dest_uris.clear()
+
+
+def on_page_content(html_content, page, config, files):
+    image = page.meta.get("image")
+    if not image:
+        if not _dest_uris:
+            _dest_uris.update(file.dest_uri for file in files)
+        for src in IMG_SRC_RE.findall(html_content):
+            if "://" in src or src.startswith(("//", "data:")):
+                continue
+            path = unquote(urlsplit(urljoin("/" + page.url, src)).path).lstrip("/")
+            if path in _dest_uris:
+                image = src
+                break
+    if image:
+        _images[page.file.src_uri] = _absolute(image, page, config)
+    return html_content
+
+
+def on_post_page(output, page, config):
+    if "</head>" not in output or 'property="og:title"' in output:
+        return output
+    description = page.meta.get("description") or page.meta.get("summary") or config.site_description
+    properties = {
+        "og:type": "article" if page.file.src_uri.startswith("blog/posts/") else "website",
+        "og:site_name": config.site_name,
+        "og:title": page.meta.get("title") or page.title or config.site_name,
+        "og:description": " ".join(str(description or "").split()),
+        "og:url": page.canonical_url,
+        "og:image": _images.get(page.file.src_uri),
+    }
+    tags = "".join(
+        f'<meta property="{name}" content="{html.escape(str(value), quote=True)}">'
+        for name, value in properties.items() if value
+    )
+    return output.replace("</head>", tags + "</head>", 1)
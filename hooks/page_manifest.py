@@ -0,0 +1,42 @@
+"""
+MkDocs hook that writes page-manifest.json into the built site.
+It maps every rendered page to its source file, URL, output file and a hash
+of its rendered content, so post-build stages and preview builds can tell
+which output belongs to which Markdown file.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = "page-manifest.json"
+MANIFEST_VERSION = 1
+
+_pages = {}
+
+
+def on_pre_build(config):
+    _pages.clear()
+
+
+def on_page_content(html, page, config, files):
+    file = page.file
+    _pages[file.dest_uri] = {
+        "src": file.src_uri,
+        "url": page.url,
+        "dest": file.dest_uri,
+        "title": page.title,
+        "hash": hashlib.sha256(html.encode("utf-8")).hexdigest()[:16],
+        "generated": file.generated_by is not None,
+    }
+    return html
+
+
+def on_post_build(config):
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "site_url": config.site_url,
+        "pages": [_pages[dest] for dest in sorted(_pages)],
+    }
+    with open(os.path.join(config.site_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, ensure_ascii=False)
@@ -0,0 +1,195 @@
+"""
+MkDocs hook that adds a "Related posts" section to every blog post.
+Posts (including the tools pages under blog/posts/tools/) are tokenised into
+a sparse term-count matrix, weighted by TF-IDF and compared with a single
+matrix product; the closest posts are linked at the end of each post. Term
+counts are cached per post and content hash, so a build only re-tokenises
+the posts that changed. The cache is kept per docs_dir, so the stub pages of
+a preview build never replace the counts of the real posts. Set
+"related: false" in the front matter to opt out.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+
+import numpy as np
+import yaml
+from scipy import sparse
+
+POSTS_DIR = "blog/posts/"
+CACHE_DIR = ".cache/related-posts"
+CACHE_VERSION = 1
+TOP_K = 3
+MIN_SIMILARITY = 0.05
+# Title and tag terms count this many times as often as body terms
+TITLE_WEIGHT = 3
+
+FRONT_MATTER_RE = re.compile(r"\A---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+CODE_BLOCK_RE = re.compile(r"^(```|~~~).*?^\1", re.DOTALL | re.MULTILINE)
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+LINK_TARGET_RE = re.compile(r"\]\([^)]*\)")
+HEADING_RE = re.compile(r"^#\s+(.+)$", re.MULTILINE)
+TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+STOPWORDS = frozenset("""
+    about after again all also and any are because been before being between both but can could did does doing
+    down during each few for from further had has have having her here hers him his how into its itself just
+    more most not now off once only other our out over own same she should some such than that the their them
+    then there these they this those through too under until very was were what when where which while who whom
+    why will with you your yours use using used get make made like need want way one two new
+""".split())
+
+_related = {}
+
+
+def tokenize(markdown):
+    """Return (title, term list) of a post's Markdown source."""
+    match = FRONT_MATTER_RE.match(markdown)
+    meta = {}
+    if match:
+        try:
+            meta = yaml.safe_load(match.group(1)) or {}
+        except yaml.YAMLError:
+            pass
+        markdown = markdown[match.end():]
+    heading = HEADING_RE.search(markdown)
+    title = str(meta.get("title") or (heading.group(1).strip() if heading else ""))
+    body = LINK_TARGET_RE.sub("]", HTML_TAG_RE.sub(" ", CODE_BLOCK_RE.sub(" ", markdown)))
+    boosted = " ".join([title] + [str(tag) for tag in meta.get("tags") or []])
+    terms = [term for term in TOKEN_RE.findall(body.lower()) if term not in STOPWORDS]
+    terms += [term for term in TOKEN_RE.findall(boosted.lower()) if term not in STOPWORDS] * TITLE_WEIGHT
+    return title, terms
+
+
+def cache_dir_for(docs_dir):
+    """Return the cache directory of a docs_dir."""
+    key = hashlib.sha256(os.path.relpath(docs_dir).replace(os.sep, "/").encode("utf-8")).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, key)
+
+
+def load_cache(cache_dir=CACHE_DIR):
+    """Load the cached term counts: (docs, vocabulary, counts matrix)."""
+    index_file = os.path.join(cache_dir, "index.json")
+    counts_file = os.path.join(cache_dir, "counts.npz")
+    if os.path.exists(index_file) and os.path.exists(counts_file):
+        with open(index_file, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") == CACHE_VERSION:
+            return index["docs"], index["vocabulary"], sparse.load_npz(counts_file).tocsr()
+    return [], [], sparse.csr_matrix((0, 0))
+
+
+def save_cache(docs, vocabulary, counts, cache_dir=CACHE_DIR):
+    """Save the term counts of all posts."""
+    os.makedirs(cache_dir, exist_ok=True)
+    sparse.save_npz(os.path.join(cache_dir, "counts.npz"), counts)
+    with open(os.path.join(cache_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "docs": docs, "vocabulary": vocabulary}, f, ensure_ascii=False)
+
+
+def update_counts(posts, cached_docs, vocabulary, cached_counts):
+    """Build the term-count matrix of posts, re-tokenising only changed ones.
+
+    posts is a list of (src, markdown). Returns (docs, vocabulary, counts,
+    retokenised) where docs lists {src, hash, title} in matrix row order and
+    terms that no post uses any more are dropped from the vocabulary.
+    """
+    cached_rows = {doc["src"]: (row, doc) for row, doc in enumerate(cached_docs)}
+    columns = {term: column for column, term in enumerate(vocabulary)}
+    vocabulary = list(vocabulary)
+    docs, rows, cols, values = [], [], [], []
+    retokenised = 0
+    for row, (src, markdown) in enumerate(posts):
+        digest = hashlib.sha256(markdown.encode("utf-8")).hexdigest()[:16]
+        cached = cached_rows.get(src)
+        if cached and cached[1]["hash"] == digest:
+            start, end = cached_counts.indptr[cached[0]], cached_counts.indptr[cached[0] + 1]
+            rows.extend([row] * (end - start))
+            cols.extend(cached_counts.indices[start:end].tolist())
+            values.extend(cached_counts.data[start:end].tolist())
+            docs.append(cached[1])
+            continue
+        title, terms = tokenize(markdown)
+        retokenised += 1
+        term_counts = {}
+        for term in terms:
+            term_counts[term] = term_counts.get(term, 0) + 1
+        for term, value in term_counts.items():
+            if term not in columns:
+                columns[term] = len(vocabulary)
+                vocabulary.append(term)
+            rows.append(row)
+            cols.append(columns[term])
+            values.append(value)
+        docs.append({"src": src, "hash": digest, "title": title})
+
+    counts = sparse.csr_matrix((np.array(values, dtype=np.float32), (rows, cols)),
+                               shape=(len(docs), len(vocabulary)))
+    # Compact the vocabulary to the terms still in use
+    used = np.flatnonzero(counts.getnnz(axis=0))
+    if len(used) < len(vocabulary):
+        counts = counts[:, used]
+        vocabulary = [vocabulary[column] for column in used]
+    return docs, vocabulary, counts.tocsr(), retokenised
+
+
+def top_related(counts, k=TOP_K, min_similarity=MIN_SIMILARITY):
+    """Return, per row, up to k (row, similarity) pairs of the most similar rows."""
+    n = counts.shape[0]
+    if n < 2:
+        return [[] for _ in range(n)]
+    tf = counts.copy()
+    tf.data = 1.0 + np.log(tf.data)
+    df = np.asarray((counts > 0).sum(axis=0)).ravel()
+    idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+    weights = tf @ sparse.diags(idf.astype(np.float32))
+    norms = np.sqrt(np.asarray(weights.multiply(weights).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    weights = sparse.diags(1.0 / norms) @ weights
+    # One sparse product gives every pairwise cosine similarity
+    similarity = (weights @ weights.T).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+
+    related = []
+    for row in range(n):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        columns, scores = similarity.indices[start:end], similarity.data[start:end]
+        if len(scores) > k:
+            best = np.argpartition(-scores, k - 1)[:k]
+            columns, scores = columns[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        related.append([(int(columns[i]), float(scores[i])) for i in order if scores[i] >= min_similarity])
+    return related
+
+
+def on_files(files, config):
+    _related.clear()
+    posts = [(file.src_uri, file.content_string) for file in files.documentation_pages()
+             if file.src_uri.startswith(POSTS_DIR)]
+    cache_dir = cache_dir_for(config["docs_dir"])
+    docs, vocabulary, counts = load_cache(cache_dir)
+    docs, vocabulary, counts, _ = update_counts(sorted(posts), docs, vocabulary, counts)
+    save_cache(docs, vocabulary, counts, cache_dir)
+    for doc, related in zip(docs, top_related(counts)):
+        _related[doc["src"]] = [docs[row] for row, _ in related]
+    return files
+
+
+def on_page_markdown(markdown, page, config, files):
+    src = page.file.src_uri
+    if page.meta.get("related") is False or not _related.get(src):
+        return markdown
+    base = posixpath.dirname(src)
+    links = []
+    for doc in _related[src]:
+        target = posixpath.relpath(doc["src"], base)
+        # Posts the author already links to need no second link
+        if posixpath.basename(doc["src"]) not in markdown:
+            title = (doc["title"] or posixpath.basename(doc["src"])).replace("[", "\\[").replace("]", "\\]")
+            links.append(f"- [{title}]({target})")
+    if not links:
+        return markdown
+    return markdown.rstrip() + "\n\n## Related posts\n\n" + "\n".join(links) + "\n"
@@ -0,0 +1,110 @@
+"""
+MkDocs hook that writes tag-index.json into the built site.
+An inverted index of the front matter tags and categories: every tagged page
+gets a numeric ID (newest first) and every tag maps to the sorted list of IDs
+that carry it. Tag listings, tag intersections and "latest in tag" widgets
+(docs/js/tag-index.js) fetch this file instead of the full tags page; the
+script is only added to pages that contain such a widget.
+Entries are kept per source file for as long as the MkDocs process runs, so a
+"mkdocs serve --dirtyreload" rebuild only refreshes the pages it rendered
+(every "mkdocs build" starts from scratch), and the file is only rewritten
+when the index changed.
+"""
+
+import json
+import os
+import posixpath
+import re
+from datetime import date, datetime
+
+INDEX_FILE = "tag-index.json"
+INDEX_VERSION = 1
+SCRIPT = "js/tag-index.js"
+WIDGET_RE = re.compile(r"\bdata-(?:tag|category)-list=")
+# Summaries are cut to keep the index to a few KB
+SUMMARY_LENGTH = 160
+
+_entries = {}
+
+
+def _date(value):
+    if isinstance(value, dict):
+        value = value.get("created") or next(iter(value.values()), None)
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)[:10] if value else ""
+
+
+def _terms(value):
+    if isinstance(value, str):
+        value = [value]
+    return sorted({str(term).strip() for term in value or [] if str(term).strip()})
+
+
+def _summary(value):
+    text = " ".join(str(value or "").split())
+    if len(text) <= SUMMARY_LENGTH:
+        return text
+    return text[:SUMMARY_LENGTH].rsplit(" ", 1)[0] + "…"
+
+
+def build_index(entries):
+    """Build the compact index from {src: entry}; IDs are ordered newest first."""
+    ordered = sorted(entries.values(), key=lambda entry: (entry["date"], entry["url"]), reverse=True)
+    index = {"version": INDEX_VERSION, "posts": [], "tags": {}, "categories": {}}
+    for post_id, entry in enumerate(ordered):
+        index["posts"].append([entry["url"], entry["title"], entry["date"], entry["summary"]])
+        for field in ("tags", "categories"):
+            for term in entry[field]:
+                index[field].setdefault(term, []).append(post_id)
+    for field in ("tags", "categories"):
+        index[field] = dict(sorted(index[field].items(), key=lambda item: item[0].lower()))
+    return index
+
+
+def on_files(files, config):
+    # Forget pages whose source was removed
+    sources = {file.src_uri for file in files.documentation_pages()}
+    for src in list(_entries):
+        if src not in sources:
+            del _entries[src]
+    return files
+
+
+def _with_script(html, page):
+    """Load the widget script on pages that use it."""
+    if not WIDGET_RE.search(html):
+        return html
+    src = posixpath.relpath(SCRIPT, posixpath.dirname("/" + page.url).lstrip("/") or ".")
+    return html + f'\n<script src="{src}" defer></script>\n'
+
+
+def on_page_content(html, page, config, files):
+    html = _with_script(html, page)
+    meta = page.meta
+    tags, categories = _terms(meta.get("tags")), _terms(meta.get("categories"))
+    if not tags and not categories:
+        _entries.pop(page.file.src_uri, None)
+        return html
+    _entries[page.file.src_uri] = {
+        "url": page.url,
+        "title": meta.get("title") or page.title or "",
+        "date": _date(meta.get("date")),
+        "summary": _summary(meta.get("summary") or meta.get("description")),
+        "tags": tags,
+        "categories": categories,
+    }
+    return html
+
+
+def on_post_build(config):
+    data = json.dumps(build_index(_entries), ensure_ascii=False, separators=(",", ":"))
+    path = os.path.join(config.site_dir, INDEX_FILE)
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == data:
+                return  # unchanged, keep the file (and its timestamp) as it is
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data)